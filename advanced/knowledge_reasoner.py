@@ -6,21 +6,23 @@
 import re
 from typing import List, Dict, Tuple, Optional, Any
 from utils.logger import get_logger
-from py2neo import Graph
+from graphdb.async_store import get_async_store, run_steps_async
+from graphdb.steps import Steps, call, check_batch, run_steps
+from graphdb.store import get_store
 
 logger = get_logger(__name__)
 
 
 class KnowledgeReasoner:
+    """
+    多跳推理
+    各 _reason_* 方法是图查询步骤生成器（graphdb.steps），
+    execute_reasoning 同步执行，execute_reasoning_async 在异步存储上执行，同一步内的查询并发进行
+    """
     
     def __init__(self):
-        try:
-            self.graph = Graph("bolt://localhost:7687", auth=("neo4j", "2512macf"))
-            self.connected = True
-        except Exception as e:
-            logger.error(f"Neo4j连接失败: {e}")
-            self.graph = None
-            self.connected = False
+        self.store = get_store()
+        self.connected = self.store.is_available()
         
         # 多跳查询定义模板
         self.multi_hop_patterns = [
@@ -100,42 +102,28 @@ class KnowledgeReasoner:
         """
         if not self.connected:
             return None
-        
+        return run_steps(self._find_disease_steps(disease_name), self.store)
+    
+    def _find_disease_steps(self, disease_name: str) -> Steps:
         # 先尝试精确匹配
-        exact_query = """
-        MATCH (d:Disease)
-        WHERE d.name = $disease
-        RETURN d.name as name
-        LIMIT 1
-        """
-        exact_result = self.graph.run(exact_query, disease=disease_name).data()
+        exact_result = yield call('find_names', 'Disease', disease_name, 'exact', limit=1)
         if exact_result:
-            return exact_result[0]['name']
+            return exact_result[0]
         
         # 如果精确匹配失败，尝试 CONTAINS 匹配，但优先匹配长度最接近的
-        contains_query = """
-        MATCH (d:Disease)
-        WHERE d.name CONTAINS $disease
-        RETURN d.name as name
-        ORDER BY 
-            CASE WHEN d.name = $disease THEN 0 ELSE 1 END,
-            ABS(LENGTH(d.name) - LENGTH($disease)),
-            d.name
-        LIMIT 5
-        """
-        contains_results = self.graph.run(contains_query, disease=disease_name).data()
+        contains_results = yield call('find_names', 'Disease', disease_name, 'contains', limit=5)
         
         if contains_results:
             # 优先返回长度最接近的，且如果输入是完整词，优先返回完全匹配的
-            best_match = contains_results[0]['name']
+            best_match = contains_results[0]
             # 如果匹配到的名称包含输入名称且长度差小于等于3，认为是合理匹配
             # 但如果输入是完整词，而匹配到的是包含它的长词则跳过
             if len(best_match) - len(disease_name) <= 3:
                 return best_match
             # 如果长度差太大，尝试找更短的匹配
             for result in contains_results:
-                if abs(len(result['name']) - len(disease_name)) <= 2:
-                    return result['name']
+                if abs(len(result) - len(disease_name)) <= 2:
+                    return result
             # 如果都太长，返回第一个
             return best_match
         
@@ -167,6 +155,27 @@ class KnowledgeReasoner:
         if not hop_info:
             return None
         
+        steps = self._reasoning_steps(hop_info)
+        return run_steps(steps, self.store) if steps else None
+    
+    async def execute_reasoning_async(self, question: str, store=None) -> Optional[Dict]:
+        """
+        推理查询的异步版本
+        store: 异步图存储（graphdb.async_store），默认取当前事件循环共享的实例
+        """
+        store = store or await get_async_store()
+        if not await store.is_available():
+            return None
+        
+        hop_info = self.detect_multi_hop(question)
+        if not hop_info:
+            return None
+        
+        steps = self._reasoning_steps(hop_info)
+        return await run_steps_async(steps, store) if steps else None
+    
+    def _reasoning_steps(self, hop_info: Dict) -> Optional[Steps]:
+        """按推理类型选择步骤生成器"""
         reasoning_type = hop_info['type']
         entity = hop_info['entity']
         
@@ -190,13 +199,13 @@ class KnowledgeReasoner:
         
         return None
     
-    def _reason_disease_complication_symptom(self, disease: str, hop_info: Dict) -> Dict:
+    def _reason_disease_complication_symptom(self, disease: str, hop_info: Dict) -> Steps:
         """
         疾病 → 并发症 → 并发症的症状
         """
         reasoning_steps = []
         
-        actual_disease = self._find_disease_by_name(disease)
+        actual_disease = yield from self._find_disease_steps(disease)
         if not actual_disease:
             return {
                 'success': False,
@@ -206,13 +215,7 @@ class KnowledgeReasoner:
             }
         
         # 查询并发症
-        comp_query = """
-        MATCH (d:Disease)-[r:acompany_with]->(comp:Disease)
-        WHERE d.name = $disease
-        RETURN d.name as disease, comp.name as complication
-        LIMIT 10
-        """
-        comp_results = self.graph.run(comp_query, disease=actual_disease).data()
+        comp_results = yield call('neighbors', 'Disease', actual_disease, 'acompany_with', 'Disease', limit=10)
         
         if not comp_results:
             return {
@@ -222,7 +225,7 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        complications = list(set([r['complication'] for r in comp_results]))
+        complications = list(set(comp_results))
         
         reasoning_steps.append({
             'step': 1,
@@ -232,18 +235,14 @@ class KnowledgeReasoner:
             'relation': 'acompany_with'
         })
         
-        # 查询并发症的症状
+        # 查询并发症的症状，各并发症互不依赖，一批发出
         comp_symptoms = {}
-        for comp in complications[:5]:
-            symp_query = """
-            MATCH (d:Disease)-[:has_symptom]->(s:Symptom)
-            WHERE d.name = $comp
-            RETURN s.name as symptom
-            LIMIT 5
-            """
-            symp_results = self.graph.run(symp_query, comp=comp).data()
+        comps = complications[:5]
+        symp_batch = check_batch((yield [
+            call('neighbors', 'Disease', comp, 'has_symptom', 'Symptom', limit=5) for comp in comps]))
+        for comp, symp_results in zip(comps, symp_batch):
             if symp_results:
-                comp_symptoms[comp] = [r['symptom'] for r in symp_results]
+                comp_symptoms[comp] = symp_results
         
         reasoning_steps.append({
             'step': 2,
@@ -274,13 +273,13 @@ class KnowledgeReasoner:
             'hop_info': hop_info
         }
     
-    def _reason_disease_complication_treatment(self, disease: str, hop_info: Dict) -> Dict:
+    def _reason_disease_complication_treatment(self, disease: str, hop_info: Dict) -> Steps:
         """
         疾病 → 并发症 → 并发症的治疗方法
         """
         reasoning_steps = []
         
-        actual_disease = self._find_disease_by_name(disease)
+        actual_disease = yield from self._find_disease_steps(disease)
         if not actual_disease:
             return {
                 'success': False,
@@ -290,13 +289,7 @@ class KnowledgeReasoner:
             }
         
         # 查询并发症
-        comp_query = """
-        MATCH (d:Disease)-[r:acompany_with]->(comp:Disease)
-        WHERE d.name = $disease
-        RETURN d.name as disease, comp.name as complication
-        LIMIT 8
-        """
-        comp_results = self.graph.run(comp_query, disease=actual_disease).data()
+        comp_results = yield call('neighbors', 'Disease', actual_disease, 'acompany_with', 'Disease', limit=8)
         
         if not comp_results:
             return {
@@ -306,7 +299,7 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        complications = list(set([r['complication'] for r in comp_results]))
+        complications = list(set(comp_results))
         
         reasoning_steps.append({
             'step': 1,
@@ -318,16 +311,13 @@ class KnowledgeReasoner:
         
         # 查询并发症的治疗药物
         comp_treatments = {}
-        for comp in complications[:5]:
-            treat_query = """
-            MATCH (d:Disease)-[:common_drug|recommand_drug]->(drug:Drug)
-            WHERE d.name = $comp
-            RETURN drug.name as drug
-            LIMIT 5
-            """
-            treat_results = self.graph.run(treat_query, comp=comp).data()
+        comps = complications[:5]
+        treat_batch = check_batch((yield [
+            call('neighbors', 'Disease', comp, ('common_drug', 'recommand_drug'), 'Drug', limit=5)
+            for comp in comps]))
+        for comp, treat_results in zip(comps, treat_batch):
             if treat_results:
-                comp_treatments[comp] = [r['drug'] for r in treat_results]
+                comp_treatments[comp] = treat_results
         
         reasoning_steps.append({
             'step': 2,
@@ -358,14 +348,14 @@ class KnowledgeReasoner:
             'hop_info': hop_info
         }
     
-    def _reason_disease_complication_food(self, disease: str, hop_info: Dict) -> Dict:
+    def _reason_disease_complication_food(self, disease: str, hop_info: Dict) -> Steps:
         """
         疾病 → 并发症 → 并发症的饮食
         """
         reasoning_steps = []
         
         # 使用智能匹配找到准确的疾病名称
-        actual_disease = self._find_disease_by_name(disease)
+        actual_disease = yield from self._find_disease_steps(disease)
         if not actual_disease:
             return {
                 'success': False,
@@ -375,13 +365,7 @@ class KnowledgeReasoner:
             }
         
         # 查询并发症
-        comp_query = """
-        MATCH (d:Disease)-[r:acompany_with]->(comp:Disease)
-        WHERE d.name = $disease
-        RETURN d.name as disease, comp.name as complication
-        LIMIT 8
-        """
-        comp_results = self.graph.run(comp_query, disease=actual_disease).data()
+        comp_results = yield call('neighbors', 'Disease', actual_disease, 'acompany_with', 'Disease', limit=8)
         
         if not comp_results:
             return {
@@ -391,7 +375,7 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        complications = list(set([r['complication'] for r in comp_results]))
+        complications = list(set(comp_results))
         
         reasoning_steps.append({
             'step': 1,
@@ -403,26 +387,14 @@ class KnowledgeReasoner:
         
         # 查询并发症的饮食建议
         comp_foods = {}
-        for comp in complications[:5]:
-            # 查询宜吃食物
-            food_good_query = """
-            MATCH (d:Disease)-[:do_eat|recommand_eat]->(f:Food)
-            WHERE d.name = $comp
-            RETURN f.name as food
-            LIMIT 5
-            """
-            food_good_results = self.graph.run(food_good_query, comp=comp).data()
-            good_foods = [r['food'] for r in food_good_results] if food_good_results else []
-            
-            # 查询忌吃食物
-            food_bad_query = """
-            MATCH (d:Disease)-[:no_eat]->(f:Food)
-            WHERE d.name = $comp
-            RETURN f.name as food
-            LIMIT 5
-            """
-            food_bad_results = self.graph.run(food_bad_query, comp=comp).data()
-            bad_foods = [r['food'] for r in food_bad_results] if food_bad_results else []
+        comps = complications[:5]
+        # 宜吃食物和忌吃食物
+        food_batch = check_batch((yield [
+            call('neighbors', 'Disease', comp, rels, 'Food', limit=5)
+            for comp in comps for rels in (('do_eat', 'recommand_eat'), 'no_eat')]))
+        for i, comp in enumerate(comps):
+            good_foods = food_batch[2 * i]
+            bad_foods = food_batch[2 * i + 1]
             
             if good_foods or bad_foods:
                 comp_foods[comp] = {
@@ -465,13 +437,13 @@ class KnowledgeReasoner:
             'hop_info': hop_info
         }
     
-    def _reason_disease_complication_prevention(self, disease: str, hop_info: Dict) -> Dict:
+    def _reason_disease_complication_prevention(self, disease: str, hop_info: Dict) -> Steps:
         """
         疾病 → 并发症 → 并发症的预防
         """
         reasoning_steps = []
         
-        actual_disease = self._find_disease_by_name(disease)
+        actual_disease = yield from self._find_disease_steps(disease)
         if not actual_disease:
             return {
                 'success': False,
@@ -481,13 +453,7 @@ class KnowledgeReasoner:
             }
         
         # 查询并发症
-        comp_query = """
-        MATCH (d:Disease)-[r:acompany_with]->(comp:Disease)
-        WHERE d.name = $disease
-        RETURN d.name as disease, comp.name as complication
-        LIMIT 8
-        """
-        comp_results = self.graph.run(comp_query, disease=actual_disease).data()
+        comp_results = yield call('neighbors', 'Disease', actual_disease, 'acompany_with', 'Disease', limit=8)
         
         if not comp_results:
             return {
@@ -497,7 +463,7 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        complications = list(set([r['complication'] for r in comp_results]))
+        complications = list(set(comp_results))
         
         reasoning_steps.append({
             'step': 1,
@@ -509,16 +475,11 @@ class KnowledgeReasoner:
         
         # 查询并发症的预防信息
         comp_preventions = {}
-        for comp in complications[:5]:
-            prevention_query = """
-            MATCH (d:Disease)
-            WHERE d.name = $comp
-            RETURN d.prevent as prevention
-            LIMIT 1
-            """
-            prevention_results = self.graph.run(prevention_query, comp=comp).data()
-            if prevention_results and prevention_results[0].get('prevention'):
-                prevention_text = prevention_results[0]['prevention']
+        comps = complications[:5]
+        props_batch = check_batch((yield [call('node_props', 'Disease', comp, ['prevent']) for comp in comps]))
+        for comp, props in zip(comps, props_batch):
+            if props and props.get('prevent'):
+                prevention_text = props['prevent']
                 if prevention_text and prevention_text.strip():
                     comp_preventions[comp] = prevention_text.strip()
         
@@ -560,13 +521,13 @@ class KnowledgeReasoner:
             'hop_info': hop_info
         }
     
-    def _reason_disease_complication(self, disease: str, hop_info: Dict) -> Dict:
+    def _reason_disease_complication(self, disease: str, hop_info: Dict) -> Steps:
         """
         疾病 → 并发症
         """
         reasoning_steps = []
         
-        actual_disease = self._find_disease_by_name(disease)
+        actual_disease = yield from self._find_disease_steps(disease)
         if not actual_disease:
             return {
                 'success': False,
@@ -575,13 +536,7 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        comp_query = """
-        MATCH (d:Disease)-[:acompany_with]->(c:Disease)
-        WHERE d.name = $disease
-        RETURN d.name as disease, c.name as complication
-        LIMIT 20
-        """
-        comp_results = self.graph.run(comp_query, disease=actual_disease).data()
+        comp_results = yield call('neighbors', 'Disease', actual_disease, 'acompany_with', 'Disease', limit=20)
         
         if not comp_results:
             return {
@@ -591,7 +546,7 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        complications = list(set([r['complication'] for r in comp_results]))
+        complications = list(set(comp_results))
         
         reasoning_steps.append({
             'step': 1,
@@ -623,20 +578,16 @@ class KnowledgeReasoner:
             'hop_info': hop_info
         }
     
-    def _reason_symptom_disease_check(self, symptom: str, hop_info: Dict) -> Dict:
+    def _reason_symptom_disease_check(self, symptom: str, hop_info: Dict) -> Steps:
         """
         症状 → 可能疾病 → 建议检查
         """
         reasoning_steps = []
         
         # 症状 → 疾病
-        disease_query = """
-        MATCH (d:Disease)-[:has_symptom]->(s:Symptom)
-        WHERE s.name CONTAINS $symptom
-        RETURN d.name as disease, s.name as symptom
-        LIMIT 8
-        """
-        disease_results = self.graph.run(disease_query, symptom=symptom).data()
+        # [(症状名, 疾病名)]
+        disease_results = yield call('neighbors_by_keyword', 'Symptom', symptom, 'has_symptom', 'Disease',
+                                     direction='in', limit=8)
         
         if not disease_results:
             return {
@@ -646,8 +597,8 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        diseases = list(set([r['disease'] for r in disease_results]))
-        actual_symptom = disease_results[0]['symptom']
+        diseases = list(set([d for _, d in disease_results]))
+        actual_symptom = disease_results[0][0]
         
         reasoning_steps.append({
             'step': 1,
@@ -659,16 +610,12 @@ class KnowledgeReasoner:
         
         # 疾病 → 检查
         disease_checks = {}
-        for disease in diseases[:5]:
-            check_query = """
-            MATCH (d:Disease)-[:need_check]->(c:Check)
-            WHERE d.name = $disease
-            RETURN c.name as check_item
-            LIMIT 5
-            """
-            check_results = self.graph.run(check_query, disease=disease).data()
+        top_diseases = diseases[:5]
+        check_batch_results = check_batch((yield [
+            call('neighbors', 'Disease', disease, 'need_check', 'Check', limit=5) for disease in top_diseases]))
+        for disease, check_results in zip(top_diseases, check_batch_results):
             if check_results:
-                disease_checks[disease] = [r['check_item'] for r in check_results]
+                disease_checks[disease] = check_results
         
         reasoning_steps.append({
             'step': 2,
@@ -700,20 +647,16 @@ class KnowledgeReasoner:
         }
     
     # 这里有点问题
-    def _reason_symptom_disease_department(self, symptom: str, hop_info: Dict) -> Dict:
+    def _reason_symptom_disease_department(self, symptom: str, hop_info: Dict) -> Steps:
         """
         症状 → 可能疾病 → 科室
         """
         reasoning_steps = []
         
         # 症状 → 疾病
-        disease_query = """
-        MATCH (d:Disease)-[:has_symptom]->(s:Symptom)
-        WHERE s.name CONTAINS $symptom
-        RETURN d.name as disease, s.name as symptom
-        LIMIT 8
-        """
-        disease_results = self.graph.run(disease_query, symptom=symptom).data()
+        # [(症状名, 疾病名)]
+        disease_results = yield call('neighbors_by_keyword', 'Symptom', symptom, 'has_symptom', 'Disease',
+                                     direction='in', limit=8)
         
         if not disease_results:
             return {
@@ -723,8 +666,8 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        diseases = list(set([r['disease'] for r in disease_results]))
-        actual_symptom = disease_results[0]['symptom']
+        diseases = list(set([d for _, d in disease_results]))
+        actual_symptom = disease_results[0][0]
         
         reasoning_steps.append({
             'step': 1,
@@ -736,16 +679,12 @@ class KnowledgeReasoner:
         
         # 疾病 → 科室
         disease_depts = {}
-        for disease in diseases[:5]:
-            dept_query = """
-            MATCH (d:Disease)-[:belongs_to]->(dept:Department)
-            WHERE d.name = $disease
-            RETURN dept.name as department
-            LIMIT 3
-            """
-            dept_results = self.graph.run(dept_query, disease=disease).data()
+        top_diseases = diseases[:5]
+        dept_batch = check_batch((yield [
+            call('neighbors', 'Disease', disease, 'belongs_to', 'Department', limit=3) for disease in top_diseases]))
+        for disease, dept_results in zip(top_diseases, dept_batch):
             if dept_results:
-                disease_depts[disease] = [r['department'] for r in dept_results]
+                disease_depts[disease] = dept_results
         
         reasoning_steps.append({
             'step': 2,
@@ -790,14 +729,14 @@ class KnowledgeReasoner:
             'hop_info': hop_info
         }
     
-    def _reason_disease_drug_department(self, disease: str, hop_info: Dict) -> Dict:
+    def _reason_disease_drug_department(self, disease: str, hop_info: Dict) -> Steps:
         """
         复合查询：疾病 → 药物 + 科室 (同时回答)
         """
         reasoning_steps = []
         
         # 使用智能匹配找到准确的疾病名称
-        actual_disease = self._find_disease_by_name(disease)
+        actual_disease = yield from self._find_disease_steps(disease)
         if not actual_disease:
             return {
                 'success': False,
@@ -806,23 +745,11 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        # 查询药物
-        drug_query = """
-        MATCH (d:Disease)-[:common_drug|recommand_drug]->(drug:Drug)
-        WHERE d.name = $disease
-        RETURN d.name as disease, drug.name as drug
-        LIMIT 10
-        """
-        drug_results = self.graph.run(drug_query, disease=actual_disease).data()
-        
-        # 查询科室
-        dept_query = """
-        MATCH (d:Disease)-[:belongs_to]->(dept:Department)
-        WHERE d.name = $disease
-        RETURN d.name as disease, dept.name as department
-        LIMIT 5
-        """
-        dept_results = self.graph.run(dept_query, disease=actual_disease).data()
+        # 查询药物和科室
+        drug_results, dept_results = check_batch((yield [
+            call('neighbors', 'Disease', actual_disease, ('common_drug', 'recommand_drug'), 'Drug', limit=10),
+            call('neighbors', 'Disease', actual_disease, 'belongs_to', 'Department', limit=5),
+        ]))
         
         if not drug_results and not dept_results:
             return {
@@ -832,8 +759,8 @@ class KnowledgeReasoner:
                 'reasoning_path': []
             }
         
-        drugs = list(set([r['drug'] for r in drug_results])) if drug_results else []
-        depts = list(set([r['department'] for r in dept_results])) if dept_results else []
+        drugs = list(set(drug_results))
+        depts = list(set(dept_results))
         
         reasoning_steps.append({
             'step': 1,
@@ -876,15 +803,11 @@ class KnowledgeReasoner:
             return {'success': False, 'message': '数据库未连接'}
         
         # 验证疾病存在
-        verify_query = """
-        MATCH (d:Disease) WHERE d.name CONTAINS $disease
-        RETURN d.name LIMIT 1
-        """
-        verify_result = self.graph.run(verify_query, disease=disease).data()
+        verify_result = self.store.find_names('Disease', disease, 'contains', limit=1)
         if not verify_result:
             return {'success': False, 'message': f'未找到「{disease}」相关信息'}
         
-        actual_disease = verify_result[0]['name']
+        actual_disease = verify_result[0]
         
         # 收集全景信息
         analysis = {
@@ -900,63 +823,21 @@ class KnowledgeReasoner:
             'cause': '',
         }
         
-        # 症状
-        symp_query = """
-        MATCH (d:Disease)-[:has_symptom]->(s:Symptom) 
-        WHERE d.name = $disease RETURN s.name as name LIMIT 10
-        """
-        analysis['symptoms'] = [r['name'] for r in self.graph.run(symp_query, disease=actual_disease).data()]
-        
-        # 药物
-        drug_query = """
-        MATCH (d:Disease)-[:common_drug|recommand_drug]->(dr:Drug) 
-        WHERE d.name = $disease RETURN dr.name as name LIMIT 10
-        """
-        analysis['drugs'] = [r['name'] for r in self.graph.run(drug_query, disease=actual_disease).data()]
-        
-        # 饮食建议
-        food_good_query = """
-        MATCH (d:Disease)-[:do_eat|recommand_eat]->(f:Food) 
-        WHERE d.name = $disease RETURN f.name as name LIMIT 8
-        """
-        analysis['foods_good'] = [r['name'] for r in self.graph.run(food_good_query, disease=actual_disease).data()]
-        
-        food_bad_query = """
-        MATCH (d:Disease)-[:no_eat]->(f:Food) 
-        WHERE d.name = $disease RETURN f.name as name LIMIT 8
-        """
-        analysis['foods_bad'] = [r['name'] for r in self.graph.run(food_bad_query, disease=actual_disease).data()]
-        
-        # 检查
-        check_query = """
-        MATCH (d:Disease)-[:need_check]->(c:Check) 
-        WHERE d.name = $disease RETURN c.name as name LIMIT 8
-        """
-        analysis['checks'] = [r['name'] for r in self.graph.run(check_query, disease=actual_disease).data()]
-        
-        # 科室
-        dept_query = """
-        MATCH (d:Disease)-[:belongs_to]->(dep:Department) 
-        WHERE d.name = $disease RETURN dep.name as name LIMIT 5
-        """
-        analysis['departments'] = [r['name'] for r in self.graph.run(dept_query, disease=actual_disease).data()]
-        
-        # 并发症
-        comp_query = """
-        MATCH (d:Disease)-[:acompany_with]->(c:Disease) 
-        WHERE d.name = $disease RETURN c.name as name LIMIT 8
-        """
-        analysis['complications'] = [r['name'] for r in self.graph.run(comp_query, disease=actual_disease).data()]
-        
-        # 属性信息
-        prop_query = """
-        MATCH (d:Disease) WHERE d.name = $disease 
-        RETURN d.prevent as prevent, d.cause as cause
-        """
-        prop_result = self.graph.run(prop_query, disease=actual_disease).data()
-        if prop_result:
-            analysis['prevention'] = prop_result[0].get('prevent', '') or ''
-            analysis['cause'] = prop_result[0].get('cause', '') or ''
+        # 症状、药物、饮食、检查、科室、并发症和属性一次取回
+        profile = self.store.profile('Disease', actual_disease, ['prevent', 'cause'], {
+            'symptoms': ('has_symptom', 'Symptom', 10),
+            'drugs': (('common_drug', 'recommand_drug'), 'Drug', 10),
+            'foods_good': (('do_eat', 'recommand_eat'), 'Food', 8),
+            'foods_bad': ('no_eat', 'Food', 8),
+            'checks': ('need_check', 'Check', 8),
+            'departments': ('belongs_to', 'Department', 5),
+            'complications': ('acompany_with', 'Disease', 8),
+        })
+        if profile:
+            for key in ('symptoms', 'drugs', 'foods_good', 'foods_bad', 'checks', 'departments', 'complications'):
+                analysis[key] = profile.get(key) or []
+            analysis['prevention'] = profile.get('prevent', '') or ''
+            analysis['cause'] = profile.get('cause', '') or ''
         
         analysis['success'] = True
         return analysis
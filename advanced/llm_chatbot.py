@@ -11,25 +11,26 @@ from utils.logger import get_logger
 from advanced.llm_client import DeepseekClient
 from advanced.rag_retriever import RAGRetriever
 from advanced.knowledge_reasoner import KnowledgeReasoner
-from nlp.question_classifier import QuestionClassifier
-from py2neo import Graph
+from nlp.question_classifier import get_classifier
+from graphdb.deadline import request_deadline
+from graphdb.store import GraphStore
 
 logger = get_logger(__name__)
 
 
 class LLMChatBot:
     
-    def __init__(self, api_key: Optional[str] = None, graph: Optional[Graph] = None):
+    def __init__(self, api_key: Optional[str] = None, store: Optional[GraphStore] = None):
         """
 
         初始化LLM聊天
         api_key: Deepseek API密钥
-        graph: Neo4j图数据库
+        store: 图存储，默认使用进程共享的实现
 
         """
         self.llm_client = DeepseekClient(api_key=api_key)
-        self.rag_retriever = RAGRetriever(graph=graph)
-        self.classifier = QuestionClassifier()  # 用于实体提取
+        self.rag_retriever = RAGRetriever(store=store)
+        self.classifier = get_classifier()  # 用于实体提取（进程共享）
         self.reasoner = KnowledgeReasoner()
         # 系统提示词
         self.system_prompt = """你是一位专业的医疗助手，基于提供的医疗知识图谱信息回答用户问题。
@@ -50,6 +51,19 @@ class LLMChatBot:
              conversation_history: Optional[List[Dict]] = None) -> tuple:
         """
         处理用户问题并生成回答
+        推理和检索共用一个图查询时限，超时的查询记录在 process_info['graph_timeouts']，
+        检索结果不完整时照常调用 LLM
+        """
+        with request_deadline() as budget:
+            answer_html, classify_result, process_info = self._chat(question, context, conversation_history)
+        if budget.failures:
+            process_info['graph_timeouts'] = budget.failures
+        return answer_html, classify_result, process_info
+    
+    def _chat(self, question: str, context: Optional[Dict] = None, 
+              conversation_history: Optional[List[Dict]] = None) -> tuple:
+        """
+        处理用户问题并生成回答
         
         Args:
             question: 用户问题
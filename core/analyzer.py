@@ -9,7 +9,7 @@
 
 """
 
-from py2neo import Graph
+from graphdb.store import get_store
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,36 +20,32 @@ class KnowledgeGraphAnalyzer:
     """
     
     def __init__(self):
-        try:
-            self.g = Graph("bolt://localhost:7687", auth=("neo4j", "2512macf"))
-            self.connected = True
-        except Exception:
-            self.g = None
-            self.connected = False
+        self.store = get_store()
+        self.connected = self.store.is_available()
     
     def get_overview_stats(self):
         """获取图谱整体统计信息"""
-        if not self.g:
+        if not self.connected:
             return None
         
         stats = {}
         try:
             # 各类节点数量
-            stats['disease_count'] = self.g.run("MATCH (n:Disease) RETURN count(n) as cnt").data()[0]['cnt']
-            stats['symptom_count'] = self.g.run("MATCH (n:Symptom) RETURN count(n) as cnt").data()[0]['cnt']
-            stats['drug_count'] = self.g.run("MATCH (n:Drug) RETURN count(n) as cnt").data()[0]['cnt']
-            stats['food_count'] = self.g.run("MATCH (n:Food) RETURN count(n) as cnt").data()[0]['cnt']
-            stats['check_count'] = self.g.run("MATCH (n:Check) RETURN count(n) as cnt").data()[0]['cnt']
-            stats['department_count'] = self.g.run("MATCH (n:Department) RETURN count(n) as cnt").data()[0]['cnt']
+            stats['disease_count'] = self.store.count_nodes('Disease')
+            stats['symptom_count'] = self.store.count_nodes('Symptom')
+            stats['drug_count'] = self.store.count_nodes('Drug')
+            stats['food_count'] = self.store.count_nodes('Food')
+            stats['check_count'] = self.store.count_nodes('Check')
+            stats['department_count'] = self.store.count_nodes('Department')
             
             # 总关系数
-            stats['total_relations'] = self.g.run("MATCH ()-[r]->() RETURN count(r) as cnt").data()[0]['cnt']
+            stats['total_relations'] = self.store.count_rels()
             
             # 各类关系数量
-            stats['rel_symptom'] = self.g.run("MATCH ()-[r:has_symptom]->() RETURN count(r) as cnt").data()[0]['cnt']
-            stats['rel_drug'] = self.g.run("MATCH ()-[r:common_drug]->() RETURN count(r) as cnt").data()[0]['cnt']
-            stats['rel_food'] = self.g.run("MATCH ()-[r:do_eat]->() RETURN count(r) as cnt").data()[0]['cnt']
-            stats['rel_check'] = self.g.run("MATCH ()-[r:need_check]->() RETURN count(r) as cnt").data()[0]['cnt']
+            stats['rel_symptom'] = self.store.count_rels('has_symptom')
+            stats['rel_drug'] = self.store.count_rels('common_drug')
+            stats['rel_food'] = self.store.count_rels('do_eat')
+            stats['rel_check'] = self.store.count_rels('need_check')
             
         except Exception as e:
             stats['error'] = str(e)
@@ -58,19 +54,19 @@ class KnowledgeGraphAnalyzer:
     
     def get_coverage_stats(self):
         """获取数据覆盖率统计"""
-        if not self.g:
+        if not self.connected:
             return None
         
         coverage = {}
         try:
-            total_diseases = self.g.run("MATCH (n:Disease) RETURN count(n) as cnt").data()[0]['cnt']
+            total_diseases = self.store.count_nodes('Disease')
             
             # 各属性覆盖率
-            has_symptom = self.g.run("MATCH (d:Disease)-[:has_symptom]->() RETURN count(DISTINCT d) as cnt").data()[0]['cnt']
-            has_drug = self.g.run("MATCH (d:Disease)-[:common_drug]->() RETURN count(DISTINCT d) as cnt").data()[0]['cnt']
-            has_food = self.g.run("MATCH (d:Disease)-[:do_eat]->() RETURN count(DISTINCT d) as cnt").data()[0]['cnt']
-            has_check = self.g.run("MATCH (d:Disease)-[:need_check]->() RETURN count(DISTINCT d) as cnt").data()[0]['cnt']
-            has_dept = self.g.run("MATCH (d:Disease)-[:belongs_to]->() RETURN count(DISTINCT d) as cnt").data()[0]['cnt']
+            has_symptom = self.store.count_with_rel('Disease', 'has_symptom')
+            has_drug = self.store.count_with_rel('Disease', 'common_drug')
+            has_food = self.store.count_with_rel('Disease', 'do_eat')
+            has_check = self.store.count_with_rel('Disease', 'need_check')
+            has_dept = self.store.count_with_rel('Disease', 'belongs_to')
             
             coverage['total'] = total_diseases
             coverage['symptom'] = {'count': has_symptom, 'rate': round(has_symptom/total_diseases*100, 1) if total_diseases > 0 else 0}
@@ -86,95 +82,62 @@ class KnowledgeGraphAnalyzer:
     
     def get_top_diseases(self, limit=10):
         """获取关联最多的热门疾病"""
-        if not self.g:
+        if not self.connected:
             return []
         try:
-            query = """
-            MATCH (d:Disease)-[r]->()
-            RETURN d.name as name, count(r) as relation_count
-            ORDER BY relation_count DESC
-            LIMIT $limit
-            """
-            return self.g.run(query, limit=limit).data()
+            rows = self.store.top_by_degree('Disease', limit=limit)
+            return [{'name': name, 'relation_count': cnt} for name, cnt in rows]
         except:
             return []
     
     def get_top_symptoms(self, limit=10):
         """获取最常见的症状"""
-        if not self.g:
+        if not self.connected:
             return []
         try:
-            query = """
-            MATCH (d:Disease)-[:has_symptom]->(s:Symptom)
-            RETURN s.name as name, count(d) as disease_count
-            ORDER BY disease_count DESC
-            LIMIT $limit
-            """
-            return self.g.run(query, limit=limit).data()
+            rows = self.store.top_by_degree('Symptom', 'has_symptom', 'Disease', direction='in', limit=limit)
+            return [{'name': name, 'disease_count': cnt} for name, cnt in rows]
         except:
             return []
     
     def find_similar_diseases(self, disease_name, limit=5):
         """查找与指定疾病有相似症状的疾病"""
-        if not self.g:
+        if not self.connected:
             return []
         try:
-            query = """
-            MATCH (d1:Disease {name: $name})-[:has_symptom]->(s:Symptom)<-[:has_symptom]-(d2:Disease)
-            WHERE d1 <> d2
-            RETURN d2.name as disease, count(DISTINCT s) as common_symptoms, 
-                   collect(DISTINCT s.name)[0..5] as symptoms
-            ORDER BY common_symptoms DESC
-            LIMIT $limit
-            """
-            return self.g.run(query, name=disease_name, limit=limit).data()
+            rows = self.store.shared_neighbors('Disease', disease_name, 'has_symptom', 'Symptom', limit=limit, sample=5)
+            return [{'disease': name, 'common_symptoms': cnt, 'symptoms': symptoms}
+                    for name, cnt, symptoms in rows]
         except:
             return []
     
     def find_common_drugs(self, disease_name):
         """查找与指定疾病共用药品的其他疾病"""
-        if not self.g:
+        if not self.connected:
             return []
         try:
-            query = """
-            MATCH (d1:Disease {name: $name})-[:common_drug]->(drug:Drug)<-[:common_drug]-(d2:Disease)
-            WHERE d1 <> d2
-            RETURN d2.name as disease, count(DISTINCT drug) as common_drugs,
-                   collect(DISTINCT drug.name)[0..3] as drugs
-            ORDER BY common_drugs DESC
-            LIMIT 5
-            """
-            return self.g.run(query, name=disease_name).data()
+            rows = self.store.shared_neighbors('Disease', disease_name, 'common_drug', 'Drug', limit=5, sample=3)
+            return [{'disease': name, 'common_drugs': cnt, 'drugs': drugs}
+                    for name, cnt, drugs in rows]
         except:
             return []
     
     def get_department_distribution(self):
         """获取疾病的科室分布"""
-        if not self.g:
+        if not self.connected:
             return []
         try:
-            query = """
-            MATCH (d:Disease)-[:belongs_to]->(dept:Department)
-            RETURN dept.name as department, count(d) as disease_count
-            ORDER BY disease_count DESC
-            LIMIT 10
-            """
-            result = self.g.run(query).data()
+            rows = self.store.top_by_degree('Department', 'belongs_to', 'Disease', direction='in', limit=10)
             
-            if not result:
-                alt_query = """
-                MATCH (d:Disease)-[r]->(dept:Department)
-                RETURN dept.name as department, count(d) as disease_count
-                ORDER BY disease_count DESC
-                LIMIT 10
-                """
-                result = self.g.run(alt_query).data()
-                if result:
-                    logger.warning(f"使用备用查询获取科室分布，找到 {len(result)} 条记录")
+            if not rows:
+                # 任意关系类型
+                rows = self.store.top_by_degree('Department', None, 'Disease', direction='in', limit=10)
+                if rows:
+                    logger.warning(f"使用备用查询获取科室分布，找到 {len(rows)} 条记录")
+            result = [{'department': name, 'disease_count': cnt} for name, cnt in rows]
             
             if not result:
-                dept_check = self.g.run("MATCH (dept:Department) RETURN count(dept) as cnt").data()
-                dept_count = dept_check[0]['cnt'] if dept_check else 0
+                dept_count = self.store.count_nodes('Department')
                 if dept_count > 0:
                     logger.warning(f"数据库中有 {dept_count} 个科室节点，但没有找到 Disease 到 Department 的关系")
                 else:
@@ -10,7 +10,8 @@
 
 import re
 from utils.logger import get_logger
-from nlp.question_classifier import QuestionClassifier
+from graphdb.deadline import current_deadline, request_deadline
+from nlp.question_classifier import get_classifier
 from nlp.question_parser import QuestionPaser
 from nlp.answer_search import AnswerSearcher
 from nlp.question_rewriter import EnhancedQuestionProcessor
@@ -26,7 +27,7 @@ class MedicalChatBot:
         初始化聊天
         """
         try:
-            self.classifier = QuestionClassifier()
+            self.classifier = get_classifier()
             self.parser = QuestionPaser()
             self.searcher = AnswerSearcher()
             self.question_processor = EnhancedQuestionProcessor()
@@ -36,6 +37,14 @@ class MedicalChatBot:
             self.question_processor = None
     
     def chat(self, question, context=None):
+        # 整个请求共用一个图查询时限，超时的查询记录在 process_info['graph_timeouts']
+        with request_deadline() as budget:
+            answer, res_classify, process_info = self._chat(question, context)
+        if budget.failures:
+            process_info['graph_timeouts'] = budget.failures
+        return answer, res_classify, process_info
+    
+    def _chat(self, question, context=None):
         default_answer = "🤔 抱歉，我暂时无法理解您的问题。请尝试描述更具体的症状或疾病名称。"
         process_info = {'method': 'rule'}
         
@@ -93,6 +102,10 @@ class MedicalChatBot:
             final_answers = self.searcher.search_main(res_sql)
             
             if not final_answers:
+                # 查询超时：提示稍后重试，而不是说知识库里没有数据
+                budget = current_deadline()
+                if budget is not None and budget.failures:
+                    return "⏱️ 抱歉，知识图谱查询超时，请稍后重试或换一个更具体的问法。", res_classify, process_info
                 # 情况 B：识别出意图但查询无数据
                 entity_names = ','.join(res_classify.get('args', {}).keys()) if res_classify.get('args') else '未知实体'
                 intent_types = ','.join(res_classify.get('question_types', [])) if res_classify.get('question_types') else '未知类型'
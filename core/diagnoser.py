@@ -7,7 +7,8 @@
 
 """
 
-from py2neo import Graph
+from graphdb.deadline import request_deadline
+from graphdb.store import get_store
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,22 +16,18 @@ logger = get_logger(__name__)
 class SymptomDiagnoser:
     """
     症状组合诊断器
-    根据用户输入的症状组合，在Neo4j知识图谱中查找匹配的疾病，
+    根据用户输入的症状组合，在知识图谱中查找匹配的疾病，
     并计算匹配度：匹配的症状数 / 总症状数
 
     """
     
     def __init__(self):
-        try:
-            self.g = Graph("bolt://localhost:7687", auth=("neo4j", "2512macf"))
-            self.connected = True
-        except:
-            self.g = None
-            self.connected = False
+        self.store = get_store()
+        self.connected = self.store.is_available()
         
         try:
-            from nlp.question_classifier import QuestionClassifier
-            self.classifier = QuestionClassifier()
+            from nlp.question_classifier import get_classifier
+            self.classifier = get_classifier()
         except Exception as e:
             logger.warning(f"分类器初始化失败: {e}")
             self.classifier = None
@@ -40,29 +37,26 @@ class SymptomDiagnoser:
         根据症状列表诊断可能的疾病
 
         """
-        if not self.g or not symptoms:
+        if not self.connected or not symptoms:
             return []
         
         results = {}
-        for symptom in symptoms:
-            try:
-                query = """
-                MATCH (d:Disease)-[:has_symptom]->(s:Symptom)
-                WHERE s.name CONTAINS $symptom
-                RETURN d.name as disease, s.name as symptom
-                """
-                data = self.g.run(query, symptom=symptom).data()
-                for item in data:
-                    disease = item['disease']
-                    if disease not in results:
-                        results[disease] = {'matched_user_symptoms': set(), 'all_symptoms': []}
-                    # 记录匹配到的用户输入症状，用于计算匹配度
-                    results[disease]['matched_user_symptoms'].add(symptom)
-                    # 记录所有相关症状
-                    if item['symptom'] not in results[disease]['all_symptoms']:
-                        results[disease]['all_symptoms'].append(item['symptom'])
-            except:
-                continue
+        # 所有症状的查询共用一个时限，超时的症状跳过，用已查到的结果诊断
+        with request_deadline():
+            for symptom in symptoms:
+                try:
+                    # 名称包含该症状的症状节点，以及具有这些症状的疾病
+                    pairs = self.store.neighbors_by_keyword('Symptom', symptom, 'has_symptom', 'Disease', direction='in')
+                    for matched_symptom, disease in pairs:
+                        if disease not in results:
+                            results[disease] = {'matched_user_symptoms': set(), 'all_symptoms': []}
+                        # 记录匹配到的用户输入症状，用于计算匹配度
+                        results[disease]['matched_user_symptoms'].add(symptom)
+                        # 记录所有相关症状
+                        if matched_symptom not in results[disease]['all_symptoms']:
+                            results[disease]['all_symptoms'].append(matched_symptom)
+                except:
+                    continue
         
         total_symptoms = len(symptoms)
         diagnosis_results = []
@@ -93,11 +87,10 @@ class SymptomDiagnoser:
         获取最常见的症状列表
         """
         try:
-            query = "MATCH (d:Disease)-[:has_symptom]->(s:Symptom) RETURN s.name as symptom, count(d) as cnt ORDER BY cnt DESC LIMIT $limit"
-            data = self.g.run(query, limit=limit).data()
+            data = self.store.top_by_degree('Symptom', 'has_symptom', 'Disease', direction='in', limit=limit)
             # 过滤掉无效的症状
             invalid_symptoms = ["驻站医", "驻站医师"] 
-            symptoms = [item['symptom'] for item in data if item['symptom'] not in invalid_symptoms]
+            symptoms = [symptom for symptom, _ in data if symptom not in invalid_symptoms]
             return symptoms
         except:
             return []
@@ -6,21 +6,18 @@
 """
 
 from streamlit_echarts import st_echarts
-from py2neo import Graph
+from graphdb.store import get_store
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 class KnowledgeGraphVisualizer:
     """
-    从Neo4j知识图谱中提取疾病相关的子图并展示
+    从知识图谱中提取疾病相关的子图并展示
     """
     
     def __init__(self):
-        try:
-            self.g = Graph("bolt://localhost:7687", auth=("neo4j", "2512macf"))
-        except Exception:
-            self.g = None
+        self.store = get_store()
     
     def get_disease_subgraph(self, disease_name):
         """
@@ -31,7 +28,7 @@ class KnowledgeGraphVisualizer:
         categories: 节点类别列表
         error: 错误信息（如果有）
         """
-        if not self.g:
+        if not self.store.is_available():
             return None, None, None, "数据库未连接"
         
         nodes = []
@@ -46,23 +43,10 @@ class KnowledgeGraphVisualizer:
         ]
         
         try:
-            # 先尝试精确匹配
-            res = self.g.run("MATCH (d:Disease) WHERE d.name = $name RETURN d.name as name", name=disease_name).data()
-            actual_disease_name = disease_name
-            
-            # 如果精确匹配失败，尝试模糊匹配
-            if not res:
-                res = self.g.run("MATCH (d:Disease) WHERE d.name CONTAINS $name RETURN d.name as name LIMIT 1", name=disease_name).data()
-                if res:
-                    actual_disease_name = res[0]['name']
+            # 依次尝试精确匹配、模糊匹配、反向匹配（输入包含疾病名称）
+            actual_disease_name = self.store.resolve_name('Disease', disease_name)
             
-            # 如果还是找不到，尝试反向匹配，疾病名称包含输入的关键词
-            if not res:
-                res = self.g.run("MATCH (d:Disease) WHERE $name CONTAINS d.name RETURN d.name as name ORDER BY length(d.name) DESC LIMIT 1", name=disease_name).data()
-                if res:
-                    actual_disease_name = res[0]['name']
-            
-            if not res:
+            if not actual_disease_name:
                 return None, None, None, f"未找到「{disease_name}」，请检查疾病名称是否正确"
             
             # 使用实际匹配到的疾病名称
@@ -70,29 +54,32 @@ class KnowledgeGraphVisualizer:
         except Exception as e:
             return None, None, None, str(e)
         
-        # 2查询关联节点，按类别分组
-        queries = [
-            ("MATCH (d:Disease)-[:has_symptom]->(n:Symptom) WHERE d.name = $name RETURN n.name LIMIT 10", 1, "症状"),
-            ("MATCH (d:Disease)-[:common_drug]->(n:Drug) WHERE d.name = $name RETURN n.name LIMIT 6", 2, "药品"),
-            ("MATCH (d:Disease)-[:recommand_drug]->(n:Drug) WHERE d.name = $name RETURN n.name LIMIT 6", 2, "药品"),
-            ("MATCH (d:Disease)-[:do_eat]->(n:Food) WHERE d.name = $name RETURN n.name LIMIT 6", 3, "食物"),
-            ("MATCH (d:Disease)-[:need_check]->(n:Check) WHERE d.name = $name RETURN n.name LIMIT 6", 4, "检查"),
-            ("MATCH (d:Disease)-[:belongs_to]->(n:Department) WHERE d.name = $name RETURN n.name LIMIT 3", 5, "科室"),
-        ]
+        # 2查询关联节点，按类别分组：结果键 -> (关系, 终点标签, 数量上限)
+        neighbor_specs = {
+            'symptoms': ('has_symptom', 'Symptom', 10),
+            'common_drugs': ('common_drug', 'Drug', 6),
+            'recommand_drugs': ('recommand_drug', 'Drug', 6),
+            'foods': ('do_eat', 'Food', 6),
+            'checks': ('need_check', 'Check', 6),
+            'departments': ('belongs_to', 'Department', 3),
+        }
+        spec_categories = {'symptoms': 1, 'common_drugs': 2, 'recommand_drugs': 2,
+                           'foods': 3, 'checks': 4, 'departments': 5}
         
         added_names = {disease_name}
         category_nodes = {1: [], 2: [], 3: [], 4: [], 5: []}
         
-        for query, category, rel_type in queries:
-            try:
-                data = self.g.run(query, name=disease_name).data()
-                for item in data:
-                    name = item.get('n.name')
-                    if name and name not in added_names:
-                        category_nodes[category].append(name)
-                        added_names.add(name)
-            except:
-                continue
+        try:
+            # 一次取出全部类别的邻居
+            profile = self.store.profile('Disease', disease_name, [], neighbor_specs) or {}
+        except Exception as e:
+            logger.warning(f"查询关联节点失败: {e}")
+            profile = {}
+        for key, category in spec_categories.items():
+            for name in profile.get(key) or []:
+                if name and name not in added_names:
+                    category_nodes[category].append(name)
+                    added_names.add(name)
         
         # 按类别放置在不同区域
         center_x, center_y = 0, 0
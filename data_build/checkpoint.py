@@ -0,0 +1,79 @@
+"""
+构建断点
+
+- 全量构建按阶段（每类节点、每种关系）逐批写入，每个批次的事务提交后记录到本地状态文件
+- 构建中断后用 --resume 重新运行，已完成的阶段直接跳过，进行中的阶段从最后提交的批次之后继续
+- 续跑时写入方式强制为 merge：最后一批可能已提交但还没来得及记录，重做时不会产生重复节点和边
+- 状态文件记录数据文件哈希和批大小，两者任一变化时批次边界不再对应，断点作废，从头构建
+- 状态文件先写临时文件再原子替换，进程在写入时被杀也不会留下损坏的状态
+- 并行写入关系时多个线程同时提交，记录和写文件在锁内进行
+
+使用方法：
+    checkpoint = BuildCheckpoint(path, source_hash, batch_size)
+    checkpoint.load()
+    for i in range(checkpoint.done('nodes:Drug'), len(batches)):
+        ...
+        checkpoint.commit('nodes:Drug', i + 1, len(batches))
+    checkpoint.clear()
+
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class BuildCheckpoint:
+
+    def __init__(self, path, source_hash, batch_size):
+        self.path = path
+        self.source_hash = source_hash
+        self.batch_size = batch_size
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        '''读取状态文件，与当前数据或批大小不匹配时丢弃，返回是否有可续跑的进度'''
+        self.stages = {}
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print('checkpoint unreadable, starting over:', e)
+            return False
+        if state.get('source_hash') != self.source_hash or state.get('batch_size') != self.batch_size:
+            print('checkpoint is for another data file or batch size, starting over')
+            return False
+        self.stages = state.get('stages', {})
+        return bool(self.stages)
+
+    def done(self, stage):
+        '''阶段中已提交的批次数'''
+        return self.stages.get(stage, {}).get('batches', 0)
+
+    def is_complete(self, stage):
+        entry = self.stages.get(stage)
+        return entry is not None and entry['batches'] >= entry['total']
+
+    def commit(self, stage, batches, total):
+        '''记录阶段已提交 batches 个批次（共 total 个）'''
+        with self._lock:
+            self.stages[stage] = {'batches': batches, 'total': total, 'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            self._save()
+
+    def clear(self):
+        '''构建完成后删除状态文件'''
+        self.stages = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {'source_hash': self.source_hash, 'batch_size': self.batch_size, 'stages': self.stages}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
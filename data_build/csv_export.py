@@ -0,0 +1,202 @@
+"""
+导出 neo4j-admin import 格式的 CSV
+
+- 每类节点一个文件 nodes_<标签>.csv，ID 就是节点名（每个标签一个 ID 空间，同一数据导出的 ID 始终相同）
+- 每种关系（按起点、终点标签区分）一个文件 rels_<起点>_<关系类型>_<终点>.csv，端点不存在的边不导出
+- 图谱版本节点 nodes_GraphMeta.csv，导入后应用的查询缓存同样按版本失效
+- import.sh 中是对应的 neo4j-admin 命令（Neo4j 5），导入后再运行 --schema-only 建约束和全文索引
+- validate_import_csv 在本地检查导出结果（表头、列数、ID 唯一、关系端点存在），不需要数据库
+
+列表属性（cure_department、cure_way）用 ARRAY_DELIMITER 连接，描述文本里有换行，导入时需要 --multiline-fields=true。
+
+"""
+
+import csv
+import os
+
+from data_build.progress import Progress
+
+# 列表属性元素之间的分隔符（单元分隔符，不会出现在文本中），对应 --array-delimiter=U+001F
+ARRAY_DELIMITER = '\x1f'
+ARRAY_DELIMITER_ARG = 'U+001F'
+
+META_LABEL = 'GraphMeta'
+
+
+def _node_file(label):
+    return 'nodes_%s.csv' % label
+
+
+def _rel_file(start_label, rel_type, end_label):
+    return 'rels_%s_%s_%s.csv' % (start_label, rel_type, end_label)
+
+
+def _cell(value):
+    if isinstance(value, (list, tuple)):
+        return ARRAY_DELIMITER.join(str(v) for v in value)
+    return value
+
+
+def _open_csv(path):
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_import_csv(graph_data, out_dir, node_labels, rel_specs, disease_props, version=None, disease_hashes=None):
+    """
+    把 MedicalGraph.read_graph() 的结果导出为 neo4j-admin import 的 CSV
+    disease_hashes: 疾病名 -> 内容哈希，写入 content_hash 列，导入后可以直接做增量更新
+    返回 {'nodes': {文件: 行数}, 'rels': {文件: 行数}, 'skipped': {关系文件: 跳过的边数}}
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    summary = {'nodes': {}, 'rels': {}, 'skipped': {}}
+    node_ids = {}
+
+    # 疾病节点带属性；列表类型的属性在表头标注 string[]
+    array_props = {prop for info in graph_data['disease_infos'] for prop in disease_props
+                   if isinstance(info.get(prop), list)}
+    header = ['name:ID(Disease)'] + [prop + (':string[]' if prop in array_props else '') for prop in disease_props]
+    if disease_hashes is not None:
+        header.append('content_hash')
+    seen = set()
+    with _open_csv(os.path.join(out_dir, _node_file('Disease'))) as f, \
+            Progress('Disease.csv', total=len(graph_data['disease_infos']), unit='rows') as bar:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for info in graph_data['disease_infos']:
+            bar.update()
+            if info['name'] in seen:
+                continue
+            seen.add(info['name'])
+            row = [info['name']] + [_cell(info.get(prop, '')) for prop in disease_props]
+            if disease_hashes is not None:
+                row.append(disease_hashes[info['name']])
+            writer.writerow(row)
+    node_ids['Disease'] = seen
+    summary['nodes'][_node_file('Disease')] = len(seen)
+
+    for label in node_labels:
+        if label == 'Disease':
+            continue
+        names = sorted(graph_data['nodes'][label])
+        with _open_csv(os.path.join(out_dir, _node_file(label))) as f:
+            writer = csv.writer(f)
+            writer.writerow(['name:ID(%s)' % label])
+            writer.writerows([name] for name in names)
+        node_ids[label] = set(names)
+        summary['nodes'][_node_file(label)] = len(names)
+
+    if version:
+        with _open_csv(os.path.join(out_dir, _node_file(META_LABEL))) as f:
+            writer = csv.writer(f)
+            writer.writerow(['key:ID(%s)' % META_LABEL, 'version'])
+            writer.writerow(['graph', version])
+        summary['nodes'][_node_file(META_LABEL)] = 1
+
+    for start_label, end_label, rels_key, rel_type, rel_name in rel_specs:
+        file_name = _rel_file(start_label, rel_type, end_label)
+        edges = list(dict.fromkeys((edge[0], edge[1]) for edge in graph_data['rels'][rels_key]))
+        written = skipped = 0
+        with _open_csv(os.path.join(out_dir, file_name)) as f, \
+                Progress(file_name, total=len(edges), unit='edges') as bar:
+            writer = csv.writer(f)
+            writer.writerow([':START_ID(%s)' % start_label, ':END_ID(%s)' % end_label, 'name'])
+            for start, end in edges:
+                bar.update()
+                if start not in node_ids[start_label] or end not in node_ids[end_label]:
+                    skipped += 1
+                    continue
+                writer.writerow([start, end, rel_name])
+                written += 1
+        summary['rels'][file_name] = written
+        if skipped:
+            summary['skipped'][file_name] = skipped
+
+    _write_import_script(out_dir, summary, rel_specs)
+    return summary
+
+
+def _write_import_script(out_dir, summary, rel_specs):
+    lines = ['#!/bin/sh',
+             '# 在停止的 Neo4j 上全量导入（会覆盖目标数据库），导入后运行:',
+             '#   python data_build/build_medicalgraph.py --schema-only',
+             'cd "$(dirname "$0")"',
+             'neo4j-admin database import full \\']
+    for file_name in summary['nodes']:
+        label = file_name[len('nodes_'):-len('.csv')]
+        lines.append('  --nodes=%s=%s \\' % (label, file_name))
+    for start_label, end_label, rels_key, rel_type, rel_name in rel_specs:
+        lines.append('  --relationships=%s=%s \\' % (rel_type, _rel_file(start_label, rel_type, end_label)))
+    lines += ['  --array-delimiter=%s \\' % ARRAY_DELIMITER_ARG,
+              '  --multiline-fields=true \\',
+              '  --overwrite-destination \\',
+              '  "${1:-neo4j}"', '']
+    path = os.path.join(out_dir, 'import.sh')
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(lines))
+    os.chmod(path, 0o755)
+
+
+def _id_space(column, prefix):
+    # 'name:ID(Disease)' -> 'Disease'，':START_ID(Disease)' -> 'Disease'
+    if prefix not in column or not column.endswith(')'):
+        return None
+    return column[column.index(prefix) + len(prefix):-1]
+
+
+def validate_import_csv(out_dir):
+    """
+    在本地检查导出的 CSV，返回问题列表（为空表示通过）
+    - 节点文件：表头有且只有一个 ID 列，每行列数与表头一致，ID 非空且在 ID 空间内唯一
+    - 关系文件：起点和终点 ID 都存在于对应的 ID 空间，每行列数一致，同一文件中没有重复的边
+    """
+    problems = []
+    ids = {}
+    files = sorted(os.listdir(out_dir))
+    for file_name in files:
+        if not (file_name.startswith('nodes_') and file_name.endswith('.csv')):
+            continue
+        with open(os.path.join(out_dir, file_name), encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            id_columns = [i for i, col in enumerate(header or []) if ':ID(' in col]
+            if len(id_columns) != 1:
+                problems.append('%s: 表头需要且只能有一个 ID 列: %s' % (file_name, header))
+                continue
+            col = id_columns[0]
+            space = ids.setdefault(_id_space(header[col], ':ID('), set())
+            for line_no, row in enumerate(reader, start=2):
+                if len(row) != len(header):
+                    problems.append('%s:%d: 列数 %d 与表头 %d 不一致' % (file_name, line_no, len(row), len(header)))
+                    continue
+                if not row[col]:
+                    problems.append('%s:%d: ID 为空' % (file_name, line_no))
+                elif row[col] in space:
+                    problems.append('%s:%d: ID 重复: %s' % (file_name, line_no, row[col]))
+                space.add(row[col])
+    for file_name in files:
+        if not (file_name.startswith('rels_') and file_name.endswith('.csv')):
+            continue
+        with open(os.path.join(out_dir, file_name), encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None) or []
+            if len(header) < 2:
+                problems.append('%s: 表头缺少 START_ID / END_ID 列: %s' % (file_name, header))
+                continue
+            start_space = ids.get(_id_space(header[0], ':START_ID('))
+            end_space = ids.get(_id_space(header[1], ':END_ID('))
+            if start_space is None or end_space is None:
+                problems.append('%s: 表头引用了不存在的 ID 空间: %s' % (file_name, header[:2]))
+                continue
+            seen = set()
+            for line_no, row in enumerate(reader, start=2):
+                if len(row) != len(header):
+                    problems.append('%s:%d: 列数 %d 与表头 %d 不一致' % (file_name, line_no, len(row), len(header)))
+                    continue
+                if row[0] not in start_space:
+                    problems.append('%s:%d: 起点不存在: %s' % (file_name, line_no, row[0]))
+                if row[1] not in end_space:
+                    problems.append('%s:%d: 终点不存在: %s' % (file_name, line_no, row[1]))
+                if (row[0], row[1]) in seen:
+                    problems.append('%s:%d: 重复的边: %s -> %s' % (file_name, line_no, row[0], row[1]))
+                seen.add((row[0], row[1]))
+    return problems
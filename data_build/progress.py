@@ -0,0 +1,83 @@
+"""
+构建进度
+
+- 终端中显示进度条：已完成数量、百分比、速率（条/秒）、已用时间
+- 输出不是终端（重定向到日志文件）时，按间隔打印一行进度，不刷屏
+- 可以在多个线程间共用（并行写入关系时）
+
+使用方法：
+    with Progress('Disease', total=len(rows), unit='nodes') as bar:
+        for batch in batches:
+            ...
+            bar.update(len(batch))
+
+"""
+
+import sys
+import threading
+import time
+
+
+class Progress:
+
+    def __init__(self, desc, total=None, unit='条', stream=None, width=30, interval=None):
+        self.desc = desc
+        self.total = total
+        self.unit = unit
+        self.stream = stream or sys.stderr
+        self.width = width
+        self.tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        # 终端刷新间隔短，日志文件里每隔几秒一行
+        self.interval = interval if interval is not None else (0.1 if self.tty else 5.0)
+        self.count = 0
+        self.started = time.monotonic()
+        self._last_render = float('-inf')
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self):
+        elapsed = self.elapsed
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+    def update(self, n=1):
+        with self._lock:
+            self.count += n
+            now = time.monotonic()
+            if now - self._last_render >= self.interval:
+                self._last_render = now
+                self._render()
+
+    def _line(self):
+        parts = [self.desc]
+        if self.total:
+            done = min(self.count / self.total, 1.0)
+            filled = int(self.width * done)
+            parts.append('[%s%s]' % ('#' * filled, '.' * (self.width - filled)))
+            parts.append('%d/%d %3d%%' % (self.count, self.total, done * 100))
+        else:
+            parts.append('%d' % self.count)
+        parts.append('%.0f %s/s' % (self.rate, self.unit))
+        parts.append('%.1fs' % self.elapsed)
+        return ' '.join(parts)
+
+    def _render(self, final=False):
+        if self.tty:
+            self.stream.write('\r' + self._line() + ('\n' if final else ''))
+        else:
+            self.stream.write(self._line() + '\n')
+        self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            self._render(final=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
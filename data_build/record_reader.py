@@ -0,0 +1,116 @@
+"""
+数据文件读取
+
+- 数据文件是 MongoDB 导出的 JSON（mongoexport），通常每行一个文档，也支持 --jsonArray 导出的数组和多行格式化的文档
+- 自动识别编码：带 BOM 或能按 UTF-8 解码的按 UTF-8 读，否则按 GB18030（GBK 的超集）读
+- Mongo 扩展 JSON 转换成普通值：{"$oid": ...} -> 字符串，{"$numberLong": ...} -> 整数，{"$date": ...} -> ISO 字符串 等
+- 按块读取、增量解码，逐条产出文档，内存占用只与块大小和单个文档的大小有关，与文件大小无关
+
+使用方法：
+    from data_build.record_reader import iter_records
+    for record in iter_records('data/medical2.json'):
+        print(record['_id'], record['name'])
+
+"""
+
+import codecs
+import datetime
+import json
+
+# 每次读取的字节数
+CHUNK_SIZE = 1 << 20
+
+# 识别编码时读取的字节数
+SAMPLE_SIZE = 1 << 20
+
+# 单个文档的上限（字符数），超过时认为文件损坏，避免把整个文件读进缓冲区
+MAX_RECORD_SIZE = 64 << 20
+
+# 文档之间允许出现的字符：空白，以及 --jsonArray 格式的方括号和逗号
+_SEPARATORS = ' \t\r\n,[]\ufeff'
+
+
+def detect_encoding(path, sample_size=SAMPLE_SIZE):
+    """识别文件编码，返回 'utf-8-sig'、'utf-8' 或 'gb18030'"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 样本末尾可能截断了一个多字节字符，final=False 时不算错误
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        codecs.getincrementaldecoder('gb18030')().decode(sample, final=False)
+        return 'gb18030'
+    except UnicodeDecodeError:
+        raise ValueError("无法识别 %s 的编码（不是 UTF-8 / GBK / GB18030）" % path)
+
+
+def _convert_date(value):
+    # {"$date": "2018-10-04T02:00:00Z"}、{"$date": 1538618400000} 或 {"$date": {"$numberLong": "..."}}
+    if isinstance(value, (int, float)):
+        moment = datetime.datetime.fromtimestamp(value / 1000, tz=datetime.timezone.utc)
+        return moment.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+# 扩展 JSON 的类型标记及转换，object_hook 自内向外调用，嵌套的 $numberLong 已经先转换好
+_EXTENDED_TYPES = {
+    '$oid': str,
+    '$numberLong': int,
+    '$numberInt': int,
+    '$numberDouble': float,
+    '$numberDecimal': float,
+    '$date': _convert_date,
+    '$symbol': str,
+    '$uuid': str,
+}
+
+
+def normalize_extended_json(obj):
+    """json.loads 的 object_hook：把只有一个类型标记键的对象转换成对应的普通值"""
+    if len(obj) == 1:
+        key, value = next(iter(obj.items()))
+        convert = _EXTENDED_TYPES.get(key)
+        if convert is not None:
+            return convert(value)
+    return obj
+
+
+def iter_records(path, encoding=None, chunk_size=CHUNK_SIZE):
+    """
+    逐条读取数据文件中的文档（已转换扩展 JSON）
+    encoding 为空时自动识别；文档格式错误时抛出 ValueError，并给出是第几个文档
+    """
+    encoding = encoding or detect_encoding(path)
+    decoder = json.JSONDecoder(object_hook=normalize_extended_json)
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    buffer = ''
+    pos = 0
+    count = 0
+    eof = False
+    with open(path, 'rb') as f:
+        while True:
+            while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos < len(buffer):
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # 文档跨越了块的边界，读入下一块再试
+                    if eof or len(buffer) - pos >= MAX_RECORD_SIZE:
+                        raise ValueError("%s 第 %d 个文档格式错误: %s" % (path, count + 1, e)) from e
+                else:
+                    count += 1
+                    pos = end
+                    yield record
+                    continue
+            if eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
@@ -0,0 +1,14 @@
+"""
+图数据库访问层
+
+- client: 进程级共享的 Neo4j 连接（连接池、线程会话、健康检查、环境变量配置）
+- cache: 查询结果缓存，键为（查询模板、参数、图谱版本），LRU 淘汰，图谱重建后自动失效
+- deadline: 请求时限（contextvars 传递），每次查询的事务超时从剩余预算推导
+- schema: name 唯一约束和全文索引，构建时创建，应用启动时检查
+- memory_engine: 从 medical.json 构建的只读内存图引擎（CSR 邻接数组 + 疾病属性列存储）
+- store: 图存储接口 GraphStore 及其 Neo4j / 内存实现，由 MEDQA_GRAPH_BACKEND 选择
+- driver_store: 基于 neo4j 官方驱动的 GraphStore（托管读事务、fetch_size 分批拉取、逐行迭代）
+- steps: 图查询步骤生成器（GraphCall）及同步执行器，同一份流程代码可同步或异步执行
+- async_store: 异步图存储（neo4j AsyncDriver，或包装同步存储的适配器）及异步步骤执行器
+
+"""
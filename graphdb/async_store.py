@@ -0,0 +1,259 @@
+"""
+异步图存储
+
+- AsyncDriverGraphStore：基于 neo4j AsyncDriver，查询文本与同步 Cypher 后端相同（store.cypher_*）
+- AsyncStoreAdapter：包装同步 GraphStore；内存后端直接在协程中执行（每次只需微秒级），
+  py2neo 后端放到线程池中执行，不阻塞事件循环
+- run_steps_async：执行 graphdb.steps 中的步骤生成器，同一批互不依赖的调用并发进行
+
+异步存储统一通过 call(op, *args, **kwargs) 调用，op 是 GraphStore 的方法名。
+AsyncDriver 的连接绑定在创建它的事件循环上，get_async_store 按事件循环分别缓存。
+
+使用方法：
+    from graphdb.async_store import get_async_store
+    store = await get_async_store()
+    names = await store.call('neighbors', 'Disease', '感冒', 'has_symptom', 'Symptom', limit=10)
+
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+
+from graphdb.cache import GRAPH_VERSION_QUERY, MISS, QueryCache, get_query_cache
+from graphdb.client import neo4j_config
+from graphdb.deadline import query_timeout, raise_if_timeout
+from graphdb.steps import Steps
+from graphdb.store import (
+    GraphStore, get_store,
+    cypher_count_nodes, cypher_count_rels, cypher_count_with_rel, cypher_find_names,
+    cypher_neighbors, cypher_neighbors_by_keyword, cypher_node_props, cypher_profile,
+    cypher_search, cypher_shared_neighbors, cypher_top_by_degree,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# GraphStore 方法名 -> 生成 Cypher 的函数
+CYPHER_OPS = {
+    'neighbors': cypher_neighbors,
+    'neighbors_by_keyword': cypher_neighbors_by_keyword,
+    'node_props': cypher_node_props,
+    'profile': cypher_profile,
+    'find_names': cypher_find_names,
+    'search': cypher_search,
+    'count_nodes': cypher_count_nodes,
+    'count_rels': cypher_count_rels,
+    'count_with_rel': cypher_count_with_rel,
+    'top_by_degree': cypher_top_by_degree,
+    'shared_neighbors': cypher_shared_neighbors,
+}
+
+
+async def _read_all(tx, query: str, params: Dict) -> List:
+    result = await tx.run(query, params)
+    return [record async for record in result]
+
+
+async def _read_dicts(tx, query: str, params: Dict) -> List[Dict]:
+    result = await tx.run(query, params)
+    return [record.data() async for record in result]
+
+
+class AsyncDriverGraphStore:
+    """
+    通过 neo4j AsyncDriver 访问 Neo4j，查询在托管读事务中执行
+    结果与同步后端共用进程级查询缓存（graphdb.cache）
+    """
+
+    backend = 'driver'
+
+    def __init__(self, driver=None, database: Optional[str] = None, fetch_size: Optional[int] = None,
+                 cache: Optional[QueryCache] = None):
+        config = neo4j_config()
+        self.database = database or config['database']
+        self.fetch_size = fetch_size or config['fetch_size']
+        self.health_check_interval = config['health_check_interval']
+        self._config = config
+        self._driver = driver
+        self._cache = cache
+        self._available = None
+        self._last_check = float('-inf')
+
+    @property
+    def cache(self) -> QueryCache:
+        return self._cache if self._cache is not None else get_query_cache()
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            from neo4j import AsyncGraphDatabase
+            config = self._config
+            self._driver = AsyncGraphDatabase.driver(
+                config['uri'], auth=(config['user'], config['password']),
+                max_connection_pool_size=config['max_connections'])
+        return self._driver
+
+    async def is_available(self) -> bool:
+        if time.monotonic() - self._last_check < self.health_check_interval:
+            return bool(self._available)
+        self._last_check = time.monotonic()
+        try:
+            await self.driver.verify_connectivity()
+            self._available = True
+        except Exception as e:
+            logger.error(f"无法连接到 Neo4j: {e}")
+            self._available = False
+        return self._available
+
+    async def _read(self, func, query: str, params: Optional[Dict]):
+        from neo4j import unit_of_work
+        from neo4j.exceptions import Neo4jError
+        timeout = query_timeout(query)
+        if timeout is not None:
+            func = unit_of_work(timeout=timeout)(functools.partial(func))
+        try:
+            async with self._session() as session:
+                return await session.execute_read(func, query, params or {})
+        except Neo4jError as e:
+            raise_if_timeout(query, e)
+            raise
+
+    def _session(self):
+        from neo4j import READ_ACCESS
+        return self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                   fetch_size=self.fetch_size)
+
+    async def _rows(self, query: str, params: Optional[Dict] = None) -> List:
+        return await self._read(_read_all, query, params)
+
+    async def _data(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        return await self._read(_read_dicts, query, params)
+
+    async def _cached(self, query: str, params: Optional[Dict], load):
+        """与 CypherGraphStore._cached 相同，load 是返回协程的函数"""
+        cache = self.cache
+        if not cache.enabled:
+            return await load()
+        if cache.version_check_due():
+            try:
+                rows = await self._rows(GRAPH_VERSION_QUERY)
+                cache.observe_version(rows[0][0] if rows else None)
+            except Exception as e:
+                logger.warning(f"读取图谱版本失败: {e}")
+        key = cache.key(query, params)
+        value = cache.lookup(key)
+        if value is MISS:
+            value = await load()
+            cache.put(key, value)
+        return value
+
+    async def run_intent(self, question_type: str, query: str, params: Dict) -> List[Dict]:
+        return await self._cached(query, params, lambda: self._data(query, params))
+
+    async def resolve_name(self, label: str, name: str) -> Optional[str]:
+        for mode in ('exact', 'contains', 'contained'):
+            names = await self.call('find_names', label, name, mode, limit=1)
+            if names:
+                return names[0]
+        return None
+
+    async def call(self, op: str, *args, **kwargs) -> Any:
+        if op == 'resolve_name':
+            return await self.resolve_name(*args, **kwargs)
+        if op == 'run_intent':
+            return await self.run_intent(*args, **kwargs)
+        plan = CYPHER_OPS.get(op)
+        if plan is None:
+            raise ValueError(f"不支持的图操作: {op}")
+        cq = plan(*args, **kwargs)
+
+        async def load():
+            return cq.shape(await self._rows(cq.query, cq.params))
+
+        return await self._cached(cq.query, cq.params, load)
+
+    async def close(self):
+        if self._driver is not None:
+            await self._driver.close()
+            self._driver = None
+
+
+class AsyncStoreAdapter:
+    """
+    把同步 GraphStore 包装成异步接口
+    offload 为 True 时在默认线程池中执行（会阻塞在网络 I/O 上的后端），否则直接执行
+    线程池中执行时复制当前上下文，请求的截止时间（request_deadline）随调用传到同步后端
+    """
+
+    def __init__(self, store: GraphStore, offload: bool = True):
+        self.store = store
+        self.backend = store.backend
+        self.offload = offload
+
+    async def _run(self, func, *args, **kwargs):
+        if not self.offload:
+            return func(*args, **kwargs)
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def is_available(self) -> bool:
+        return await self._run(self.store.is_available)
+
+    async def call(self, op: str, *args, **kwargs) -> Any:
+        return await self._run(getattr(self.store, op), *args, **kwargs)
+
+    async def close(self):
+        pass
+
+
+async def run_steps_async(steps: Steps, store) -> Any:
+    """在异步存储上执行步骤生成器，一批调用用 asyncio.gather 并发执行"""
+    try:
+        request = next(steps)
+        while True:
+            if isinstance(request, list):
+                results = await asyncio.gather(
+                    *(store.call(c.op, *c.args, **c.kwargs) for c in request),
+                    return_exceptions=True)
+                request = steps.send(list(results))
+                continue
+            try:
+                result = await store.call(request.op, *request.args, **request.kwargs)
+            except Exception as e:
+                request = steps.throw(e)
+                continue
+            request = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+_async_stores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]' = weakref.WeakKeyDictionary()
+_async_stores_lock = threading.Lock()
+
+
+def _create_async_store(backend: str):
+    if backend == 'driver':
+        return AsyncDriverGraphStore()
+    if backend == 'memory':
+        return AsyncStoreAdapter(get_store('memory'), offload=False)
+    return AsyncStoreAdapter(get_store(backend), offload=True)
+
+
+async def get_async_store(backend: Optional[str] = None):
+    """
+    获取当前事件循环共享的异步图存储
+    backend 未指定时取环境变量 MEDQA_GRAPH_BACKEND，默认 neo4j
+    """
+    backend = (backend or os.getenv('MEDQA_GRAPH_BACKEND', 'neo4j')).strip().lower()
+    loop = asyncio.get_running_loop()
+    with _async_stores_lock:
+        stores = _async_stores.setdefault(loop, {})
+        store = stores.get(backend)
+        if store is None:
+            store = _create_async_store(backend)
+            stores[backend] = store
+    return store
@@ -0,0 +1,152 @@
+"""
+图查询结果缓存
+
+- 知识图谱只在运行 build_medicalgraph.py 时变化，相同的查询对所有用户返回相同的结果
+- Cypher 后端（py2neo / 官方驱动，含异步版本）执行查询前先查缓存，键为（查询模板、参数、图谱版本）
+- 图谱版本由构建脚本在结束时写入元数据节点 (:GraphMeta {key: 'graph'})，
+  缓存按间隔读取版本号，版本变化时清空全部缓存
+- 条目数有上限，按最近最少使用（LRU）淘汰，记录命中、未命中和淘汰次数
+- 缓存里保存结果的副本，调用方修改返回值不会影响缓存
+- 逐行迭代的意图查询（iter_intent）读到够用就停止，不经过缓存；内存后端本身不需要缓存
+
+环境变量：
+    MEDQA_QUERY_CACHE_SIZE              缓存条目上限，默认 2048，0 表示关闭缓存
+    MEDQA_CACHE_VERSION_CHECK_INTERVAL  检查图谱版本的间隔（秒），默认 10
+
+使用方法：
+    from graphdb.cache import get_query_cache
+    get_query_cache().stats()
+    # {'size': 120, 'max_size': 2048, 'hits': 860, 'misses': 120, 'evictions': 0, 'hit_rate': 0.878, 'version': '...'}
+
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 图谱版本元数据节点
+GRAPH_META_LABEL = 'GraphMeta'
+GRAPH_META_KEY = 'graph'
+GRAPH_VERSION_QUERY = f"MATCH (m:{GRAPH_META_LABEL} {{key: '{GRAPH_META_KEY}'}}) RETURN m.version AS version LIMIT 1"
+
+# lookup 未命中时的返回值
+MISS = object()
+
+
+def _freeze(value) -> Hashable:
+    """把查询参数转换成可哈希的形式（列表 -> 元组，字典 -> 排序后的键值对元组）"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_freeze(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    return value
+
+
+class QueryCache:
+    """
+    线程安全的 LRU 查询缓存
+    max_size 为 0 时关闭缓存，lookup 总是未命中，put 不保存
+    """
+
+    def __init__(self, max_size: int = 2048, version_check_interval: float = 10):
+        self.max_size = max_size
+        self.version_check_interval = version_check_interval
+        self.version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        self._last_version_check = float('-inf')
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'QueryCache':
+        return cls(int(os.getenv('MEDQA_QUERY_CACHE_SIZE', '2048')),
+                   float(os.getenv('MEDQA_CACHE_VERSION_CHECK_INTERVAL', '10')))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def key(self, query: str, params: Optional[Dict] = None) -> Tuple:
+        return (query, _freeze(params or {}), self.version)
+
+    def lookup(self, key: Tuple) -> Any:
+        """命中时返回结果的副本，否则返回 MISS"""
+        with self._lock:
+            value = self._entries.get(key, MISS)
+            if value is MISS:
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Tuple, value: Any):
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def version_check_due(self) -> bool:
+        """到了检查图谱版本的时间时返回 True，并把下一次检查推迟一个间隔"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_version_check < self.version_check_interval:
+                return False
+            self._last_version_check = now
+            return True
+
+    def observe_version(self, version: Optional[str]):
+        """记录当前的图谱版本，与之前不同时清空缓存"""
+        with self._lock:
+            if version == self.version:
+                return
+            if self._entries:
+                logger.info(f"图谱版本变化（{self.version} -> {version}），清空查询缓存（{len(self._entries)} 条）")
+            self.version = version
+            self._entries.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+                'version': self.version,
+            }
+
+
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """获取进程共享的查询缓存"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QueryCache.from_env()
+    return _cache
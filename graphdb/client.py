@@ -0,0 +1,202 @@
+"""
+Neo4j 连接管理
+
+- 整个进程共用一个 py2neo Graph，所有组件都从这里获取连接
+- 连接池有上限，避免并发用户把 Neo4j 的连接数打满
+- 每个线程可以开启自己的会话（事务），互不干扰
+- 定期做健康检查，连接失效后自动重建
+
+环境变量：
+    NEO4J_BOLT_URL / NEO4J_URI      连接地址，默认 bolt://localhost:7687
+    NEO4J_USER                      用户名，默认 neo4j
+    NEO4J_PASSWORD                  密码，必须设置，没有默认值
+    NEO4J_MAX_CONNECTIONS           连接池上限，默认 20
+    NEO4J_HEALTH_CHECK_INTERVAL     健康检查间隔（秒），默认 30
+    NEO4J_DATABASE                  数据库名（仅官方驱动后端使用），默认使用服务器的默认库
+    NEO4J_FETCH_SIZE                每批拉取的记录数（仅官方驱动后端使用），默认 1000
+
+使用方法：
+    from graphdb.client import get_graph
+    g = get_graph()
+    if g:
+        g.run("MATCH (n:Disease) RETURN count(n)").data()
+
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from py2neo import Graph
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+_password_warned = False
+
+
+def neo4j_config() -> Dict:
+    """
+    从环境变量读取 Neo4j 连接配置，py2neo 和官方驱动共用
+    未设置 NEO4J_PASSWORD 时 password 为 None 并记录错误，之后的连接会因认证失败而不可用
+    """
+    global _password_warned
+    password = os.getenv('NEO4J_PASSWORD') or None
+    if password is None and not _password_warned:
+        logger.error("未设置环境变量 NEO4J_PASSWORD，无法连接 Neo4j（见 README 中的连接配置）")
+        _password_warned = True
+    return {
+        'uri': os.getenv('NEO4J_BOLT_URL') or os.getenv('NEO4J_URI', 'bolt://localhost:7687'),
+        'user': os.getenv('NEO4J_USER', 'neo4j'),
+        'password': password,
+        'max_connections': int(os.getenv('NEO4J_MAX_CONNECTIONS', '20')),
+        'health_check_interval': float(os.getenv('NEO4J_HEALTH_CHECK_INTERVAL', '30')),
+        'database': os.getenv('NEO4J_DATABASE') or None,
+        'fetch_size': int(os.getenv('NEO4J_FETCH_SIZE', '1000')),
+    }
+
+
+class GraphClient:
+    """
+    对 py2neo Graph 的一层包装，负责连接池、线程会话和健康检查
+    """
+
+    def __init__(self, uri: str, user: str, password: Optional[str],
+                 max_connections: int = 20, health_check_interval: float = 30):
+        self.uri = uri
+        self.user = user
+        self.password = password
+        self.max_connections = max_connections
+        self.health_check_interval = health_check_interval
+
+        self._graph = None
+        self._last_check = float('-inf')
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> 'GraphClient':
+        """从环境变量读取配置"""
+        config = neo4j_config()
+        return cls(config['uri'], config['user'], config['password'],
+                   config['max_connections'], config['health_check_interval'])
+
+    def _connect(self) -> Optional[Graph]:
+        if not self.password:
+            logger.error("Neo4j 密码为空，请设置环境变量 NEO4J_PASSWORD")
+            return None
+        try:
+            graph = Graph(self.uri, auth=(self.user, self.password), max_size=self.max_connections)
+            logger.info(f"Neo4j 已连接: {self.uri}（连接池上限 {self.max_connections}）")
+            return graph
+        except Exception as e:
+            logger.error(f"无法连接到 Neo4j: {e}")
+            return None
+
+    @property
+    def graph(self) -> Optional[Graph]:
+        """
+        获取共享的 Graph，首次访问时建立连接，之后按间隔做健康检查
+        连接失败时返回 None，并在下一个检查间隔之后再重试
+        """
+        if not self._check_due():
+            return self._graph
+        with self._lock:
+            if not self._check_due():
+                return self._graph
+            if self._graph is not None:
+                if not self._ping(self._graph):
+                    logger.warning("Neo4j 健康检查失败，重建连接")
+                    self._close_graph()
+            if self._graph is None:
+                self._graph = self._connect()
+                self._last_check = time.monotonic()
+            return self._graph
+
+    def _check_due(self) -> bool:
+        return time.monotonic() - self._last_check >= self.health_check_interval
+
+    def _ping(self, graph: Graph) -> bool:
+        self._last_check = time.monotonic()
+        try:
+            graph.run("RETURN 1").evaluate()
+            return True
+        except Exception as e:
+            logger.warning(f"Neo4j 健康检查异常: {e}")
+            return False
+
+    def is_healthy(self) -> bool:
+        """立即做一次健康检查"""
+        graph = self.graph
+        if graph is None:
+            return False
+        with self._lock:
+            return self._ping(graph)
+
+    @contextmanager
+    def session(self, readonly: bool = True):
+        """
+        当前线程的会话（显式事务）
+        同一线程内嵌套使用时复用外层事务，退出最外层时提交或回滚
+        """
+        tx = getattr(self._local, 'tx', None)
+        if tx is not None:
+            yield tx
+            return
+        graph = self.graph
+        if graph is None:
+            raise ConnectionError("Neo4j 未连接")
+        tx = graph.begin(readonly=readonly)
+        self._local.tx = tx
+        try:
+            yield tx
+            graph.commit(tx)
+        except Exception:
+            graph.rollback(tx)
+            raise
+        finally:
+            self._local.tx = None
+
+    def _close_graph(self):
+        if self._graph is not None:
+            try:
+                self._graph.service.connector.close()
+            except Exception:
+                pass
+            self._graph = None
+
+    def close(self):
+        with self._lock:
+            self._close_graph()
+
+
+_clients: Dict[str, GraphClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str = 'default') -> GraphClient:
+    """获取（必要时创建）指定名称的共享客户端"""
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = GraphClient.from_env()
+                _clients[name] = client
+    return client
+
+
+def get_graph() -> Optional[Graph]:
+    """获取共享的 Graph，未连接时返回 None"""
+    return get_client().graph
+
+
+def close_all():
+    """关闭所有客户端（测试或进程退出时使用）"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
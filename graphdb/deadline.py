@@ -0,0 +1,126 @@
+"""
+请求时限
+
+- 每个用户请求有一个总时限（预算），请求内的每次图查询都从剩余预算推导事务超时
+- 官方驱动后端（含异步版本）把超时作为事务超时交给服务器，超时后由 Neo4j 终止查询，
+  不会让一个慢查询（如对 desc 的 CONTAINS 全表扫描）长时间占住工作线程
+- py2neo 不支持事务超时，只在每次查询开始前检查预算，已用完时不再发出查询；
+  内存后端的操作在微秒级，不检查时限
+- 超时的查询记录在 Deadline.failures 中，由调用方写入 process_info，并降级返回已有的结果
+
+时限通过 contextvars 传递：asyncio 任务自动继承，提交到线程池时需要用 contextvars.copy_context().run。
+嵌套的 request_deadline 只会收紧时限，超时记录汇总到最外层。
+
+环境变量：
+    MEDQA_REQUEST_TIMEOUT   单个请求的总时限（秒），默认 5
+
+使用方法：
+    from graphdb.deadline import request_deadline
+    with request_deadline(3) as budget:
+        store.search('Disease', '头痛', ('name', 'desc'))
+    if budget.failures:
+        process_info['graph_timeouts'] = budget.failures
+
+"""
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 小于这个值的剩余时间按已超时处理（Neo4j 的事务超时以毫秒为单位，0 表示不限时）
+MIN_QUERY_TIMEOUT = 0.001
+
+# Neo4j 因事务超时终止查询时的错误码片段
+_TIMEOUT_CODES = ('TransactionTimedOut', 'Transaction.Terminated')
+
+
+class QueryTimeout(TimeoutError):
+    """请求预算用完，或查询因事务超时被服务器终止"""
+
+
+class Deadline:
+    """
+    一个请求的时限
+    有 parent 时时限不晚于 parent，超时记录与 parent 共用
+    """
+
+    def __init__(self, budget: float, parent: Optional['Deadline'] = None):
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget
+        if parent is not None:
+            self.started_at = parent.started_at
+            self.expires_at = min(self.expires_at, parent.expires_at)
+        self.failures: List[Dict] = parent.failures if parent is not None else []
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_QUERY_TIMEOUT
+
+    def record(self, query: str, reason: str):
+        """记录一次超时，query 只保留开头部分"""
+        summary = ' '.join((query or '').split())[:80]
+        elapsed = round(time.monotonic() - self.started_at, 3)
+        self.failures.append({'query': summary, 'reason': reason, 'elapsed': elapsed})
+        logger.warning(f"图查询超时（{reason}，已用 {elapsed}s）: {summary}")
+
+    @contextmanager
+    def active(self):
+        """在当前上下文中启用这个时限"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+_current: 'contextvars.ContextVar[Optional[Deadline]]' = contextvars.ContextVar('graph_deadline', default=None)
+
+
+def default_budget() -> float:
+    return float(os.getenv('MEDQA_REQUEST_TIMEOUT', '5'))
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def request_deadline(budget: Optional[float] = None):
+    """开启一个请求时限，已在时限内时只收紧、不放宽"""
+    deadline = Deadline(budget if budget is not None else default_budget(), current_deadline())
+    with deadline.active():
+        yield deadline
+
+
+def query_timeout(query: str) -> Optional[float]:
+    """
+    当前查询可用的事务超时（秒），没有请求时限时返回 None
+    预算已用完时记录并抛出 QueryTimeout
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    remaining = deadline.remaining()
+    if remaining < MIN_QUERY_TIMEOUT:
+        deadline.record(query, 'budget_exhausted')
+        raise QueryTimeout("请求时限已到，未执行查询")
+    return remaining
+
+
+def raise_if_timeout(query: str, error: Exception):
+    """error 是 Neo4j 的事务超时错误时记录并转换成 QueryTimeout，否则什么也不做"""
+    code = getattr(error, 'code', None) or ''
+    if any(part in code for part in _TIMEOUT_CODES):
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.record(query, 'server_timeout')
+        raise QueryTimeout(f"查询超时，已被服务器终止: {code}") from error
@@ -0,0 +1,145 @@
+"""
+基于 neo4j 官方驱动的图存储
+
+- 普通查询在托管读事务（session.execute_read）中执行，遇到可重试的错误由驱动自动重试
+- 记录按 fetch_size 分批从服务器拉取，只取几列的查询直接使用驱动返回的元组记录
+- 意图查询可以逐行迭代（iter_intent），结果很多的意图（如常见食物的 food_not_disease）
+  读到够用就停止，内存占用与结果总数无关，第一行返回得也更早
+- 在请求时限（graphdb.deadline）内执行时，剩余预算作为事务超时交给服务器，超时的查询由 Neo4j 终止
+
+环境变量（其余连接配置与 graphdb.client 相同）：
+    NEO4J_DATABASE      数据库名，默认使用服务器的默认库
+    NEO4J_FETCH_SIZE    每批拉取的记录数，默认 1000
+
+使用方法：
+    export MEDQA_GRAPH_BACKEND=driver
+    from graphdb.store import get_store
+    store = get_store()
+
+"""
+
+import functools
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from neo4j import GraphDatabase, READ_ACCESS, unit_of_work
+from neo4j.exceptions import Neo4jError
+from graphdb.cache import QueryCache
+from graphdb.client import neo4j_config
+from graphdb.deadline import query_timeout, raise_if_timeout
+from graphdb.store import CypherGraphStore
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _read_all(tx, query: str, params: Dict) -> List:
+    # Record 是 tuple 的子类，直接保留，不再转换成字典
+    return list(tx.run(query, params))
+
+
+def _read_dicts(tx, query: str, params: Dict) -> List[Dict]:
+    return [record.data() for record in tx.run(query, params)]
+
+
+def with_timeout(func, timeout: Optional[float]):
+    """给托管事务函数附加事务超时；包一层 partial，避免在共用的函数上设置属性"""
+    if timeout is None:
+        return func
+    return unit_of_work(timeout=timeout)(functools.partial(func))
+
+
+class DriverGraphStore(CypherGraphStore):
+    """
+    通过官方驱动访问 Neo4j
+    driver 未指定时按环境变量创建，连接池上限与 py2neo 后端相同
+    """
+
+    backend = 'driver'
+
+    def __init__(self, driver=None, database: Optional[str] = None, fetch_size: Optional[int] = None,
+                 cache: Optional[QueryCache] = None):
+        config = neo4j_config()
+        self.database = database or config['database']
+        self.fetch_size = fetch_size or config['fetch_size']
+        self.health_check_interval = config['health_check_interval']
+        self._config = config
+        self._driver = driver
+        self._available = None
+        self._last_check = float('-inf')
+        self._cache = cache
+        self._lock = threading.Lock()
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            with self._lock:
+                if self._driver is None:
+                    config = self._config
+                    self._driver = GraphDatabase.driver(
+                        config['uri'], auth=(config['user'], config['password']),
+                        max_connection_pool_size=config['max_connections'])
+        return self._driver
+
+    def is_available(self) -> bool:
+        """按健康检查间隔缓存连通性检查的结果"""
+        if time.monotonic() - self._last_check < self.health_check_interval:
+            return bool(self._available)
+        with self._lock:
+            self._last_check = time.monotonic()
+        try:
+            self.driver.verify_connectivity()
+            if not self._available:
+                logger.info(f"Neo4j 已连接（官方驱动）: {self._config['uri']}")
+            self._available = True
+        except Exception as e:
+            logger.error(f"无法连接到 Neo4j: {e}")
+            self._available = False
+        return self._available
+
+    def session(self, fetch_size: Optional[int] = None):
+        return self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                   fetch_size=fetch_size or self.fetch_size)
+
+    def _read(self, func, query: str, params: Optional[Dict]):
+        timeout = query_timeout(query)
+        try:
+            with self.session() as session:
+                return session.execute_read(with_timeout(func, timeout), query, params or {})
+        except Neo4jError as e:
+            raise_if_timeout(query, e)
+            raise
+
+    def _data(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        return self._read(_read_dicts, query, params)
+
+    def _rows(self, query: str, params: Optional[Dict] = None) -> List[tuple]:
+        return self._read(_read_all, query, params)
+
+    def stream(self, query: str, params: Optional[Dict] = None,
+               fetch_size: Optional[int] = None) -> Iterator[tuple]:
+        """
+        逐条返回记录（元组），每次只从服务器拉取 fetch_size 条
+        托管事务的回调不能把未读完的结果交出去，这里在读模式会话中使用显式读事务；
+        迭代提前结束时事务随会话关闭，服务器端丢弃剩余结果
+        """
+        timeout = query_timeout(query)
+        try:
+            with self.session(fetch_size) as session:
+                with session.begin_transaction(timeout=timeout) as tx:
+                    for record in tx.run(query, params or {}):
+                        yield record
+        except Neo4jError as e:
+            raise_if_timeout(query, e)
+            raise
+
+    def iter_intent(self, question_type: str, query: str, params: Dict) -> Iterator[Dict]:
+        for record in self.stream(query, params):
+            yield record.data()
+
+    def close(self):
+        with self._lock:
+            if self._driver is not None:
+                self._driver.close()
+                self._driver = None
@@ -0,0 +1,318 @@
+"""
+内存图引擎
+
+- 直接读取构建图谱用的 medical.json，在进程内建立只读的知识图谱，不需要 Neo4j
+- 每类节点维护 名称↔编号 的字典
+- 每种关系用 NumPy int32 的 CSR 数组保存出边和入边
+- 疾病属性按列存储
+- 支持 QuestionPaser 的全部意图，返回的行与对应 Cypher 查询的列名一致
+
+使用方法：
+    from graphdb.memory_engine import get_memory_graph
+    engine = get_memory_graph()
+    rows = engine.run('disease_drug', {'names': ['感冒']})
+
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Disease 节点上保存的属性，与 MedicalGraph.create_diseases_nodes 一致
+DISEASE_FIELDS = ['desc', 'prevent', 'cause', 'easy_get', 'cure_lasttime',
+                  'cure_department', 'cure_way', 'cured_prob']
+
+# 疾病属性类意图：意图 -> 属性名
+PROP_INTENTS = {
+    'disease_cause': 'cause',
+    'disease_prevent': 'prevent',
+    'disease_lasttime': 'cure_lasttime',
+    'disease_cureprob': 'cured_prob',
+    'disease_cureway': 'cure_way',
+    'disease_easyget': 'easy_get',
+    'disease_desc': 'desc',
+}
+
+# 单跳关系类意图：意图 -> (起点标签, 关系类型, 终点标签, 实体所在一端)
+# 返回行统一为 m.name（起点）、r.name、n.name（终点）
+EDGE_INTENTS = {
+    'disease_symptom': ('Disease', ('has_symptom',), 'Symptom', 'out'),
+    'disease_not_food': ('Disease', ('no_eat',), 'Food', 'out'),
+    'disease_do_food': ('Disease', ('do_eat', 'recommand_eat'), 'Food', 'out'),
+    'food_not_disease': ('Disease', ('no_eat',), 'Food', 'in'),
+    'food_do_disease': ('Disease', ('do_eat', 'recommand_eat'), 'Food', 'in'),
+    'disease_drug': ('Disease', ('common_drug', 'recommand_drug'), 'Drug', 'out'),
+    'drug_disease': ('Disease', ('common_drug', 'recommand_drug'), 'Drug', 'in'),
+    'disease_check': ('Disease', ('need_check',), 'Check', 'out'),
+    'check_disease': ('Disease', ('need_check',), 'Check', 'in'),
+    'disease_department': ('Disease', ('belongs_to',), 'Department', 'out'),
+}
+
+
+class CSRAdjacency:
+    """
+    压缩稀疏行格式的邻接表
+    indptr[i]:indptr[i+1] 是节点 i 的邻居在 indices 中的区间
+    """
+
+    def __init__(self, n_nodes: int, src: np.ndarray, dst: np.ndarray):
+        # 稳定排序，保留同一起点下边的原始顺序
+        order = np.argsort(src, kind='stable')
+        self.indices = dst[order].astype(np.int32)
+        counts = np.bincount(src, minlength=n_nodes)
+        self.indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+        np.cumsum(counts, out=self.indptr[1:])
+
+    def neighbors(self, node_id: int) -> np.ndarray:
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def degree(self, node_id: int) -> int:
+        return int(self.indptr[node_id + 1] - self.indptr[node_id])
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+
+class Relation:
+    """一种 (起点标签, 关系类型, 终点标签) 的全部边，同时保存正向和反向 CSR"""
+
+    def __init__(self, start_label: str, rel_type: str, end_label: str, rel_name: str,
+                 n_start: int, n_end: int, src: np.ndarray, dst: np.ndarray):
+        self.start_label = start_label
+        self.rel_type = rel_type
+        self.end_label = end_label
+        self.rel_name = rel_name
+        self.out = CSRAdjacency(n_start, src, dst)
+        self.inc = CSRAdjacency(n_end, dst, src)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.out.indices)
+
+
+class MemoryGraph:
+    """
+    只读的内存知识图谱
+    """
+
+    def __init__(self):
+        self.names: Dict[str, List[str]] = {}
+        self.ids: Dict[str, Dict[str, int]] = {}
+        self.relations: Dict[Tuple[str, str, str], Relation] = {}
+        self.disease_attrs: Dict[str, List] = {}
+
+    @classmethod
+    def from_json(cls, data_path: Optional[str] = None) -> 'MemoryGraph':
+        """读取 medical.json，解析逻辑与构建 Neo4j 图谱时相同"""
+        from data_build.build_medicalgraph import MedicalGraph
+        return cls.from_parsed(MedicalGraph(data_path).read_graph())
+
+    @classmethod
+    def from_parsed(cls, graph_data: Dict) -> 'MemoryGraph':
+        """从 MedicalGraph.read_graph() 的结果构建"""
+        from data_build.build_medicalgraph import NODE_LABELS, REL_SPECS
+        engine = cls()
+
+        for label in NODE_LABELS:
+            names = sorted(set(graph_data['nodes'].get(label, ())))
+            engine.names[label] = names
+            engine.ids[label] = {name: i for i, name in enumerate(names)}
+
+        # 疾病属性列存储，同名疾病以最后一条记录为准
+        n_disease = len(engine.names['Disease'])
+        engine.disease_attrs = {field: [''] * n_disease for field in DISEASE_FIELDS}
+        disease_ids = engine.ids['Disease']
+        for info in graph_data['disease_infos']:
+            idx = disease_ids.get(info['name'])
+            if idx is None:
+                continue
+            for field in DISEASE_FIELDS:
+                engine.disease_attrs[field][idx] = info.get(field, '')
+
+        for start_label, end_label, rels_key, rel_type, rel_name in REL_SPECS:
+            start_ids = engine.ids[start_label]
+            end_ids = engine.ids[end_label]
+            src, dst = [], []
+            seen = set()
+            for edge in graph_data['rels'].get(rels_key, ()):
+                # 与 Neo4j 构建时一致：去重，端点不存在的边不建立
+                s = start_ids.get(edge[0])
+                d = end_ids.get(edge[1])
+                if s is None or d is None or (s, d) in seen:
+                    continue
+                seen.add((s, d))
+                src.append(s)
+                dst.append(d)
+            engine.relations[(start_label, rel_type, end_label)] = Relation(
+                start_label, rel_type, end_label, rel_name,
+                len(start_ids), len(end_ids),
+                np.asarray(src, dtype=np.int32), np.asarray(dst, dtype=np.int32))
+
+        logger.info("内存图谱加载完成：%s 个节点，%s 条边",
+                    sum(len(v) for v in engine.names.values()),
+                    sum(r.edge_count for r in engine.relations.values()))
+        return engine
+
+    # ---------- 基础访问 ----------
+
+    def node_id(self, label: str, name: str) -> Optional[int]:
+        return self.ids.get(label, {}).get(name)
+
+    def relation(self, start_label: str, rel_type: str, end_label: str) -> Optional[Relation]:
+        return self.relations.get((start_label, rel_type, end_label))
+
+    def disease_attr(self, name: str, field: str):
+        idx = self.node_id('Disease', name)
+        column = self.disease_attrs.get(field)
+        if idx is None or column is None:
+            return None
+        return column[idx]
+
+    def _edge_rows(self, start_label: str, rel_types, end_label: str, names: List[str], direction: str) -> List[Dict]:
+        """按实体顺序展开单跳关系，返回 m.name / r.name / n.name 行"""
+        rows = []
+        start_names = self.names[start_label]
+        end_names = self.names[end_label]
+        entity_label = start_label if direction == 'out' else end_label
+        for name in names:
+            idx = self.node_id(entity_label, name)
+            if idx is None:
+                continue
+            for rel_type in rel_types:
+                rel = self.relation(start_label, rel_type, end_label)
+                if rel is None:
+                    continue
+                if direction == 'out':
+                    for j in rel.out.neighbors(idx):
+                        rows.append({'m.name': name, 'r.name': rel.rel_name, 'n.name': end_names[j]})
+                else:
+                    for j in rel.inc.neighbors(idx):
+                        rows.append({'m.name': start_names[j], 'r.name': rel.rel_name, 'n.name': name})
+        return rows
+
+    def _rank_by_symptoms(self, symptoms: List[str], limit: int = 8) -> List[Tuple[int, int, List[str]]]:
+        """
+        多症状组合查疾病：按命中症状数降序、疾病症状总数升序排序
+        返回 [(疾病编号, 命中数, 命中的症状)]
+        """
+        rel = self.relation('Disease', 'has_symptom', 'Symptom')
+        if rel is None:
+            return []
+        matched: Dict[int, List[str]] = {}
+        for name in symptoms:
+            idx = self.node_id('Symptom', name)
+            if idx is None:
+                continue
+            for d in rel.inc.neighbors(idx):
+                matched.setdefault(int(d), []).append(name)
+        if not matched:
+            return []
+        total = rel.out.degrees()
+        ranked = sorted(matched.items(), key=lambda x: (-len(x[1]), int(total[x[0]])))
+        return [(d, len(syms), syms) for d, syms in ranked[:limit]]
+
+    # ---------- 意图查询 ----------
+
+    def run(self, question_type: str, params: Dict) -> List[Dict]:
+        """
+        执行 QuestionPaser 生成的意图查询
+        params 与 Cypher 查询的参数相同（names: 实体列表）
+        """
+        names = [n for n in params.get('names', []) if n]
+        if not names:
+            return []
+
+        if question_type in PROP_INTENTS:
+            field = PROP_INTENTS[question_type]
+            column = self.disease_attrs[field]
+            rows = []
+            for name in names:
+                idx = self.node_id('Disease', name)
+                if idx is not None:
+                    rows.append({'m.name': name, f'm.{field}': column[idx]})
+            return rows
+
+        if question_type in EDGE_INTENTS:
+            start_label, rel_types, end_label, direction = EDGE_INTENTS[question_type]
+            return self._edge_rows(start_label, rel_types, end_label, names, direction)
+
+        if question_type == 'disease_acompany':
+            # 先出边后入边，与 Cypher 中 UNION ALL 的顺序一致
+            return (self._edge_rows('Disease', ('acompany_with',), 'Disease', names, 'out') +
+                    self._edge_rows('Disease', ('acompany_with',), 'Disease', names, 'in'))
+
+        if question_type in ('symptom_disease', 'symptom_cureway'):
+            disease_names = self.names['Disease']
+            cure_way = self.disease_attrs['cure_way']
+            rows = []
+            for d, count, syms in self._rank_by_symptoms(names):
+                row = {'m.name': disease_names[d], 'matched_symptoms': syms, 'match_count': count}
+                if question_type == 'symptom_cureway':
+                    row['m.cure_way'] = cure_way[d]
+                rows.append(row)
+            return rows
+
+        if question_type == 'symptom_drug':
+            has_symptom = self.relation('Disease', 'has_symptom', 'Symptom')
+            common_drug = self.relation('Disease', 'common_drug', 'Drug')
+            if has_symptom is None or common_drug is None:
+                return []
+            disease_names = self.names['Disease']
+            drug_names = self.names['Drug']
+            rows = []
+            for name in names:
+                idx = self.node_id('Symptom', name)
+                if idx is None:
+                    continue
+                # 每个症状最多返回 5 条 (疾病, 药品)
+                count = 0
+                for d in has_symptom.inc.neighbors(idx):
+                    for drug in common_drug.out.neighbors(d):
+                        rows.append({'d.name': disease_names[d], 'n.name': drug_names[drug], 's.name': name})
+                        count += 1
+                        if count >= 5:
+                            break
+                    if count >= 5:
+                        break
+            return rows
+
+        if question_type == 'drug_producer':
+            rel = self.relation('Drug', 'produced_by', 'Producer')
+            if rel is None:
+                return []
+            producer_names = self.names['Producer']
+            rows = []
+            for name in names:
+                idx = self.node_id('Drug', name)
+                if idx is not None:
+                    rows += [{'n.name': name, 'm.name': producer_names[j]} for j in rel.out.neighbors(idx)]
+            return rows
+
+        if question_type == 'drug_desc':
+            # Drug 节点上没有 desc 属性，与 Neo4j 中的返回一致
+            return [{'n.name': name, 'n.desc': None} for name in names if self.node_id('Drug', name) is not None]
+
+        logger.warning(f"内存图谱不支持的意图: {question_type}")
+        return []
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_memory_graph(data_path: Optional[str] = None) -> MemoryGraph:
+    """
+    获取进程共享的内存图谱，首次调用时加载
+    数据文件路径优先取参数，其次取环境变量 MEDQA_DATA_PATH
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = MemoryGraph.from_json(data_path or os.getenv('MEDQA_DATA_PATH'))
+    return _engine
@@ -0,0 +1,147 @@
+"""
+图谱 schema
+
+- 各类节点 name 上的唯一约束：按名称查找（意图查询、推理、诊断、可视化）走约束自带的索引，
+  没有约束时每次查找都是对整个标签的扫描
+- 全文索引：Disease 的 desc/cause/prevent，Drug 的 desc
+- ensure_schema 由构建脚本在写入节点前执行，可重复执行
+- verify_schema 在应用启动时检查，缺失时按节点数估算对查询延迟的影响，并醒目地告警
+
+需要 Neo4j 4.4 及以上（SHOW / CREATE ... IF NOT EXISTS 语法）。
+
+使用方法：
+    from graphdb.schema import ensure_schema, verify_schema
+    run = lambda query, params=None: graph.run(query, params or {}).data()
+    ensure_schema(run)
+    issues = verify_schema(run)
+
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 需要 name 唯一约束的标签
+UNIQUE_NAME_LABELS = ['Disease', 'Symptom', 'Drug', 'Food', 'Check', 'Department', 'Producer']
+
+# 全文索引：索引名 -> (标签, 属性)
+FULLTEXT_INDEXES = {
+    'disease_text': ('Disease', ['desc', 'cause', 'prevent']),
+    'drug_text': ('Drug', ['desc']),
+}
+
+# 估算标签扫描代价：页缓存命中时每个节点约 1.5 微秒
+SCAN_COST_MS_PER_NODE = 0.0015
+
+# 执行 Cypher 并返回字典行
+Runner = Callable[..., List[Dict]]
+
+
+def constraint_name(label: str) -> str:
+    return '%s_name_unique' % label.lower()
+
+
+def ensure_schema(run: Runner) -> List[str]:
+    """
+    创建缺失的约束和全文索引，返回创建失败的说明（如已有重名节点导致唯一约束无法建立）
+    旧版本构建脚本建的普通 name 索引与唯一约束冲突，先删除
+    """
+    errors = []
+    for label in UNIQUE_NAME_LABELS:
+        try:
+            run("DROP INDEX %s_name IF EXISTS" % label.lower())
+            run("CREATE CONSTRAINT %s IF NOT EXISTS FOR (n:%s) REQUIRE n.name IS UNIQUE"
+                % (constraint_name(label), label))
+        except Exception as e:
+            errors.append("%s.name 唯一约束创建失败: %s" % (label, e))
+    for index_name, (label, props) in FULLTEXT_INDEXES.items():
+        fields = ', '.join('n.%s' % prop for prop in props)
+        try:
+            run("CREATE FULLTEXT INDEX %s IF NOT EXISTS FOR (n:%s) ON EACH [%s]" % (index_name, label, fields))
+        except Exception as e:
+            errors.append("全文索引 %s 创建失败: %s" % (index_name, e))
+    try:
+        run("CALL db.awaitIndexes(300)")
+    except Exception as e:
+        errors.append("等待索引上线失败: %s" % e)
+    for error in errors:
+        logger.error(error)
+    return errors
+
+
+def _count(run: Runner, label: str) -> int:
+    rows = run("MATCH (n:%s) RETURN count(n) AS cnt" % label)
+    return rows[0]['cnt'] if rows else 0
+
+
+def verify_schema(run: Runner) -> List[Dict]:
+    """
+    检查约束和全文索引，返回缺失项：{'kind', 'label', 'name', 'nodes', 'impact'}
+    索引存在但未上线（POPULATING / FAILED）也算缺失
+    """
+    constraints = run("SHOW CONSTRAINTS YIELD type, labelsOrTypes, properties")
+    unique_labels = {c['labelsOrTypes'][0] for c in constraints
+                     if 'UNIQUE' in (c.get('type') or '') and c.get('properties') == ['name']
+                     and c.get('labelsOrTypes')}
+    indexes = run("SHOW INDEXES YIELD name, type, state")
+    online_fulltext = {i['name'] for i in indexes if i.get('type') == 'FULLTEXT' and i.get('state') == 'ONLINE'}
+
+    issues = []
+    for label in UNIQUE_NAME_LABELS:
+        if label in unique_labels:
+            continue
+        nodes = _count(run, label)
+        issues.append({
+            'kind': 'constraint',
+            'label': label,
+            'name': constraint_name(label),
+            'nodes': nodes,
+            'impact': "每次按名称查找 %s 扫描全部 %d 个节点，预计每次 +%.1fms（有索引时 <1ms）"
+                      % (label, nodes, nodes * SCAN_COST_MS_PER_NODE),
+        })
+    for index_name, (label, props) in FULLTEXT_INDEXES.items():
+        if index_name in online_fulltext:
+            continue
+        nodes = _count(run, label)
+        issues.append({
+            'kind': 'fulltext',
+            'label': label,
+            'name': index_name,
+            'nodes': nodes,
+            'impact': "%s.%s 的文本检索只能逐个节点做 CONTAINS，%d 个节点的长文本预计每次 +%.0fms 以上"
+                      % (label, '/'.join(props), nodes, nodes * SCAN_COST_MS_PER_NODE * 10),
+        })
+    return issues
+
+
+def warn_schema_issues(issues: List[Dict]):
+    """醒目地输出缺失的 schema 及其延迟影响"""
+    if not issues:
+        logger.info("图谱 schema 检查通过（唯一约束与全文索引齐全）")
+        return
+    banner = '=' * 72
+    logger.warning(banner)
+    logger.warning("图谱缺少 %d 项约束/索引，查询会退化为全标签扫描：" % len(issues))
+    for issue in issues:
+        logger.warning("  [%s] %s: %s" % (issue['kind'], issue['name'], issue['impact']))
+    logger.warning("请运行 python data_build/build_medicalgraph.py --schema-only 补建")
+    logger.warning(banner)
+
+
+def check_store_schema(store) -> Optional[List[Dict]]:
+    """
+    应用启动时检查当前图存储的 schema，返回缺失项
+    内存后端没有 schema，连接不可用或检查失败时返回 None
+    """
+    from graphdb.store import CypherGraphStore
+    if not isinstance(store, CypherGraphStore) or not store.is_available():
+        return None
+    try:
+        issues = verify_schema(store._data)
+    except Exception as e:
+        logger.warning(f"图谱 schema 检查失败: {e}")
+        return None
+    warn_schema_issues(issues)
+    return issues
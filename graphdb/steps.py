@@ -0,0 +1,81 @@
+"""
+图查询步骤
+
+多跳推理、RAG 检索这类流程由若干次图操作组成，后一步往往依赖前一步的结果。
+把流程写成生成器，每次 yield 一个 GraphCall（或一组互不依赖的 GraphCall），
+由执行器完成调用后把结果送回生成器：
+
+- run_steps：在同步 GraphStore 上逐个执行
+- graphdb.async_store.run_steps_async：在异步存储上执行，一组调用并发进行
+
+这样同一份流程代码同时提供同步和异步两个版本。
+
+约定：
+- yield 单个 GraphCall 时送回结果，调用出错时异常在 yield 处抛出
+- yield GraphCall 列表时送回同样长度的结果列表，出错的项是异常对象，
+  需要出错即失败时用 check_batch 处理
+
+使用方法：
+    def steps(name):
+        disease = yield call('resolve_name', 'Disease', name)
+        symptoms, drugs = check_batch((yield [
+            call('neighbors', 'Disease', disease, 'has_symptom', 'Symptom', limit=5),
+            call('neighbors', 'Disease', disease, 'common_drug', 'Drug', limit=5),
+        ]))
+        return symptoms, drugs
+
+    result = run_steps(steps('感冒'), get_store())
+
+"""
+
+from typing import Any, Dict, Generator, List, NamedTuple, Tuple, Union
+
+
+class GraphCall(NamedTuple):
+    """一次图操作：GraphStore 的方法名和参数"""
+    op: str
+    args: Tuple
+    kwargs: Dict
+
+
+def call(op: str, *args, **kwargs) -> GraphCall:
+    return GraphCall(op, args, kwargs)
+
+
+Steps = Generator[Union[GraphCall, List[GraphCall]], Any, Any]
+
+
+def check_batch(results: List) -> List:
+    """批量结果中有异常时抛出第一个"""
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return results
+
+
+def _invoke(store, graph_call: GraphCall):
+    return getattr(store, graph_call.op)(*graph_call.args, **graph_call.kwargs)
+
+
+def run_steps(steps: Steps, store) -> Any:
+    """在同步 GraphStore 上执行步骤生成器，返回生成器的返回值"""
+    try:
+        request = next(steps)
+        while True:
+            if isinstance(request, list):
+                results = []
+                for graph_call in request:
+                    try:
+                        results.append(_invoke(store, graph_call))
+                    except Exception as e:
+                        results.append(e)
+                request = steps.send(results)
+                continue
+            try:
+                result = _invoke(store, request)
+            except Exception as e:
+                request = steps.throw(e)
+                continue
+            request = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
@@ -0,0 +1,596 @@
+"""
+图存储接口
+
+- GraphStore 定义业务代码需要的全部图操作（邻居、节点属性、名称解析、统计聚合、意图查询）
+- Neo4jGraphStore：通过共享的 py2neo 连接执行 Cypher
+- DriverGraphStore（graphdb.driver_store）：基于 neo4j 官方驱动，流式读取记录
+- MemoryGraphStore：在内存图引擎（graphdb.memory_engine）上完成同样的操作
+- 业务模块（core/、nlp/、advanced/）只依赖 GraphStore，不再直接拼写 Cypher
+
+环境变量：
+    MEDQA_GRAPH_BACKEND     neo4j（默认，py2neo）、driver（官方驱动）或 memory
+
+使用方法：
+    from graphdb.store import get_store
+    store = get_store()
+    if store.is_available():
+        store.neighbors('Disease', '感冒', 'has_symptom', 'Symptom', limit=10)
+
+"""
+
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Protocol, Sequence, Tuple, Union
+
+import numpy as np
+from graphdb.cache import GRAPH_VERSION_QUERY, MISS, QueryCache, get_query_cache
+from graphdb.client import get_graph
+from graphdb.deadline import query_timeout
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 关系类型：单个类型或类型列表（多个类型之间是“或”的关系）
+RelTypes = Optional[Union[str, Sequence[str]]]
+
+# profile 中的邻居规格：结果键 -> (关系类型, 终点标签, 数量上限)，均为出边
+NeighborSpecs = Dict[str, Tuple[RelTypes, str, int]]
+
+
+class GraphStore(Protocol):
+    """
+    图存储需要提供的操作
+    direction 为 'out' 时 name 是关系起点，为 'in' 时 name 是关系终点
+    """
+
+    backend: str
+
+    def is_available(self) -> bool:
+        """存储是否可用（Neo4j 已连接 / 内存图谱已加载）"""
+        ...
+
+    def run_intent(self, question_type: str, query: str, params: Dict) -> List[Dict]:
+        """执行 QuestionPaser 生成的意图查询，返回行的列名与 Cypher 查询一致"""
+        ...
+
+    def iter_intent(self, question_type: str, query: str, params: Dict) -> Iterator[Dict]:
+        """与 run_intent 相同，但逐行返回；提前停止迭代时不再读取剩余的行"""
+        ...
+
+    def neighbors(self, label: str, name: str, rels: RelTypes, target_label: str,
+                  direction: str = 'out', limit: Optional[int] = None) -> List[str]:
+        """单跳邻居的名称"""
+        ...
+
+    def neighbors_by_keyword(self, label: str, keyword: str, rels: RelTypes, target_label: str,
+                             direction: str = 'out', limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """名称包含 keyword 的节点及其邻居，返回 [(节点名, 邻居名)]"""
+        ...
+
+    def node_props(self, label: str, name: str, fields: Sequence[str]) -> Optional[Dict]:
+        """节点属性，节点不存在时返回 None"""
+        ...
+
+    def profile(self, label: str, name: str, fields: Sequence[str],
+                neighbor_specs: NeighborSpecs) -> Optional[Dict]:
+        """一次取出节点属性和若干类邻居列表，节点不存在时返回 None"""
+        ...
+
+    def find_names(self, label: str, keyword: str, mode: str = 'exact', limit: int = 5) -> List[str]:
+        """
+        按名称查找节点
+        mode: exact 完全相同；contains 名称包含 keyword（长度最接近的优先）；
+              contained keyword 包含名称（名称最长的优先）
+        """
+        ...
+
+    def resolve_name(self, label: str, name: str) -> Optional[str]:
+        """依次尝试 exact、contains、contained，返回最合适的节点名"""
+        ...
+
+    def search(self, label: str, keyword: str, fields: Sequence[str] = ('name',),
+               limit: int = 5) -> List[str]:
+        """任一属性包含 keyword（不区分大小写）的节点名称"""
+        ...
+
+    def count_nodes(self, label: str) -> int:
+        ...
+
+    def count_rels(self, rel: Optional[str] = None) -> int:
+        ...
+
+    def count_with_rel(self, label: str, rel: str) -> int:
+        """至少有一条 rel 出边的 label 节点数"""
+        ...
+
+    def top_by_degree(self, label: str, rels: RelTypes = None, other_label: Optional[str] = None,
+                      direction: str = 'out', limit: int = 10) -> List[Tuple[str, int]]:
+        """按关系数量排序的节点，返回 [(名称, 关系数)]"""
+        ...
+
+    def shared_neighbors(self, label: str, name: str, rel: str, target_label: str,
+                         limit: int = 5, sample: int = 5) -> List[Tuple[str, int, List[str]]]:
+        """与 name 共享 rel 邻居的同类节点，返回 [(名称, 共享数, 部分共享邻居)]"""
+        ...
+
+
+def _rel_list(rels: RelTypes) -> List[str]:
+    if rels is None:
+        return []
+    if isinstance(rels, str):
+        return [rels]
+    return list(rels)
+
+
+class BaseGraphStore:
+    """两种实现共用的逻辑"""
+
+    backend = ''
+
+    def resolve_name(self, label: str, name: str) -> Optional[str]:
+        for mode in ('exact', 'contains', 'contained'):
+            names = self.find_names(label, name, mode, limit=1)
+            if names:
+                return names[0]
+        return None
+
+
+# ---------- Neo4j ----------
+
+_IDENT_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _ident(value: str) -> str:
+    """标签、关系类型和属性名不能参数化，拼进查询前先校验"""
+    if not _IDENT_RE.match(value or ''):
+        raise ValueError(f"非法的标识符: {value!r}")
+    return value
+
+
+def _rel_pattern(rels: RelTypes) -> str:
+    types = _rel_list(rels)
+    if not types:
+        return ''
+    return ':' + '|'.join(_ident(t) for t in types)
+
+
+def _label_pattern(label: Optional[str]) -> str:
+    return f':{_ident(label)}' if label else ''
+
+
+def _arrow(direction: str, rel: str) -> str:
+    if direction == 'out':
+        return f'-[{rel}]->'
+    if direction == 'in':
+        return f'<-[{rel}]-'
+    raise ValueError(f"非法的方向: {direction!r}")
+
+
+class CypherQuery(NamedTuple):
+    """一次图操作对应的 Cypher：查询文本、参数，以及把元组行整理成返回值的函数"""
+    query: str
+    params: Dict
+    shape: Callable[[List[tuple]], Any]
+
+
+def _limit(limit: Optional[int]) -> str:
+    return ' LIMIT $limit' if limit is not None else ''
+
+
+def _first_value(rows):
+    return rows[0][0] if rows else 0
+
+
+def _first_dict(columns):
+    return lambda rows: dict(zip(columns, rows[0])) if rows else None
+
+
+# 以下函数只生成查询，不执行；同步和异步的 Cypher 后端共用
+
+def cypher_neighbors(label, name, rels, target_label, direction='out', limit=None) -> CypherQuery:
+    arrow = _arrow(direction, _rel_pattern(rels))
+    query = (f"MATCH (a{_label_pattern(label)}){arrow}(b{_label_pattern(target_label)}) "
+             f"WHERE a.name = $name RETURN b.name AS name{_limit(limit)}")
+    return CypherQuery(query, {'name': name, 'limit': limit}, lambda rows: [r[0] for r in rows])
+
+
+def cypher_neighbors_by_keyword(label, keyword, rels, target_label, direction='out', limit=None) -> CypherQuery:
+    arrow = _arrow(direction, _rel_pattern(rels))
+    query = (f"MATCH (a{_label_pattern(label)}){arrow}(b{_label_pattern(target_label)}) "
+             f"WHERE a.name CONTAINS $keyword RETURN a.name AS name, b.name AS neighbor{_limit(limit)}")
+    return CypherQuery(query, {'keyword': keyword, 'limit': limit}, lambda rows: [(r[0], r[1]) for r in rows])
+
+
+def cypher_node_props(label, name, fields) -> CypherQuery:
+    fields = list(fields) or ['name']
+    returns = ', '.join(f"a.{_ident(f)} AS {f}" for f in fields)
+    query = f"MATCH (a{_label_pattern(label)}) WHERE a.name = $name RETURN {returns} LIMIT 1"
+    return CypherQuery(query, {'name': name}, _first_dict(fields))
+
+
+def cypher_profile(label, name, fields, neighbor_specs) -> CypherQuery:
+    # 用模式推导式取各类邻居，避免多个 OPTIONAL MATCH 相乘
+    columns = ['name'] + list(fields)
+    returns = [f"a.{_ident(f)} AS {f}" for f in columns]
+    for key, (rels, target_label, limit) in neighbor_specs.items():
+        returns.append(f"[(a)-[{_rel_pattern(rels)}]->(x{_label_pattern(target_label)}) | x.name]"
+                       f"[0..{int(limit)}] AS {_ident(key)}")
+        columns.append(key)
+    query = (f"MATCH (a{_label_pattern(label)}) WHERE a.name = $name "
+             f"RETURN {', '.join(returns)} LIMIT 1")
+    return CypherQuery(query, {'name': name}, _first_dict(columns))
+
+
+def cypher_find_names(label, keyword, mode='exact', limit=5) -> CypherQuery:
+    node = f"(a{_label_pattern(label)})"
+    if mode == 'exact':
+        query = f"MATCH {node} WHERE a.name = $keyword RETURN a.name AS name LIMIT $limit"
+    elif mode == 'contains':
+        query = (f"MATCH {node} WHERE a.name CONTAINS $keyword RETURN a.name AS name "
+                 f"ORDER BY abs(size(a.name) - size($keyword)), a.name LIMIT $limit")
+    elif mode == 'contained':
+        query = (f"MATCH {node} WHERE $keyword CONTAINS a.name RETURN a.name AS name "
+                 f"ORDER BY size(a.name) DESC, a.name LIMIT $limit")
+    else:
+        raise ValueError(f"非法的匹配方式: {mode!r}")
+    return CypherQuery(query, {'keyword': keyword, 'limit': limit}, lambda rows: [r[0] for r in rows])
+
+
+def cypher_search(label, keyword, fields=('name',), limit=5) -> CypherQuery:
+    where = ' OR '.join(f"toLower(a.{_ident(f)}) CONTAINS $kw" for f in fields)
+    query = f"MATCH (a{_label_pattern(label)}) WHERE {where} RETURN a.name AS name LIMIT $limit"
+    return CypherQuery(query, {'kw': (keyword or '').lower(), 'limit': limit},
+                       lambda rows: [r[0] for r in rows if r[0]])
+
+
+def cypher_count_nodes(label) -> CypherQuery:
+    return CypherQuery(f"MATCH (n{_label_pattern(label)}) RETURN count(n) AS cnt", {}, _first_value)
+
+
+def cypher_count_rels(rel=None) -> CypherQuery:
+    return CypherQuery(f"MATCH ()-[r{_rel_pattern(rel)}]->() RETURN count(r) AS cnt", {}, _first_value)
+
+
+def cypher_count_with_rel(label, rel) -> CypherQuery:
+    query = f"MATCH (a{_label_pattern(label)})-[{_rel_pattern(rel)}]->() RETURN count(DISTINCT a) AS cnt"
+    return CypherQuery(query, {}, _first_value)
+
+
+def cypher_top_by_degree(label, rels=None, other_label=None, direction='out', limit=10) -> CypherQuery:
+    arrow = _arrow(direction, 'r' + _rel_pattern(rels))
+    query = (f"MATCH (a{_label_pattern(label)}){arrow}(b{_label_pattern(other_label)}) "
+             f"RETURN a.name AS name, count(r) AS cnt ORDER BY cnt DESC LIMIT $limit")
+    return CypherQuery(query, {'limit': limit}, lambda rows: [(r[0], r[1]) for r in rows])
+
+
+def cypher_shared_neighbors(label, name, rel, target_label, limit=5, sample=5) -> CypherQuery:
+    node = _label_pattern(label)
+    query = (f"MATCH (a{node} {{name: $name}})-[{_rel_pattern(rel)}]->(x{_label_pattern(target_label)})"
+             f"<-[{_rel_pattern(rel)}]-(b{node}) WHERE a <> b "
+             f"RETURN b.name AS name, count(DISTINCT x) AS cnt, collect(DISTINCT x.name)[0..{int(sample)}] AS sample "
+             f"ORDER BY cnt DESC LIMIT $limit")
+    return CypherQuery(query, {'name': name, 'limit': limit}, lambda rows: [(r[0], r[1], r[2]) for r in rows])
+
+
+class CypherGraphStore(BaseGraphStore):
+    """
+    用 Cypher 实现 GraphStore，子类只需提供 _data（执行查询并返回字典行）
+    各操作的查询由 cypher_* 函数生成，通过 _rows 按列顺序取元组，子类可以覆盖 _rows 以省去构造字典
+    结果经过查询缓存（graphdb.cache），未指定 cache 时使用进程共享的缓存
+    """
+
+    _cache: Optional[QueryCache] = None
+
+    @property
+    def cache(self) -> QueryCache:
+        return self._cache if self._cache is not None else get_query_cache()
+
+    def _data(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    def _rows(self, query: str, params: Optional[Dict] = None) -> List[tuple]:
+        return [tuple(r.values()) for r in self._data(query, params)]
+
+    def _graph_version(self) -> Optional[str]:
+        rows = self._rows(GRAPH_VERSION_QUERY)
+        return rows[0][0] if rows else None
+
+    def _cached(self, query: str, params: Optional[Dict], load: Callable[[], Any]):
+        """读穿缓存：按间隔确认图谱版本，命中直接返回，未命中执行 load 并写入缓存"""
+        cache = self.cache
+        if not cache.enabled:
+            return load()
+        if cache.version_check_due():
+            try:
+                cache.observe_version(self._graph_version())
+            except Exception as e:
+                logger.warning(f"读取图谱版本失败: {e}")
+        key = cache.key(query, params)
+        value = cache.lookup(key)
+        if value is MISS:
+            value = load()
+            cache.put(key, value)
+        return value
+
+    def _execute(self, cq: CypherQuery):
+        return self._cached(cq.query, cq.params, lambda: cq.shape(self._rows(cq.query, cq.params)))
+
+    def run_intent(self, question_type: str, query: str, params: Dict) -> List[Dict]:
+        return self._cached(query, params, lambda: self._data(query, params))
+
+    def iter_intent(self, question_type: str, query: str, params: Dict) -> Iterator[Dict]:
+        return iter(self.run_intent(question_type, query, params))
+
+    def neighbors(self, label, name, rels, target_label, direction='out', limit=None):
+        return self._execute(cypher_neighbors(label, name, rels, target_label, direction, limit))
+
+    def neighbors_by_keyword(self, label, keyword, rels, target_label, direction='out', limit=None):
+        return self._execute(cypher_neighbors_by_keyword(label, keyword, rels, target_label, direction, limit))
+
+    def node_props(self, label, name, fields):
+        return self._execute(cypher_node_props(label, name, fields))
+
+    def profile(self, label, name, fields, neighbor_specs):
+        return self._execute(cypher_profile(label, name, fields, neighbor_specs))
+
+    def find_names(self, label, keyword, mode='exact', limit=5):
+        return self._execute(cypher_find_names(label, keyword, mode, limit))
+
+    def search(self, label, keyword, fields=('name',), limit=5):
+        return self._execute(cypher_search(label, keyword, fields, limit))
+
+    def count_nodes(self, label):
+        return self._execute(cypher_count_nodes(label))
+
+    def count_rels(self, rel=None):
+        return self._execute(cypher_count_rels(rel))
+
+    def count_with_rel(self, label, rel):
+        return self._execute(cypher_count_with_rel(label, rel))
+
+    def top_by_degree(self, label, rels=None, other_label=None, direction='out', limit=10):
+        return self._execute(cypher_top_by_degree(label, rels, other_label, direction, limit))
+
+    def shared_neighbors(self, label, name, rel, target_label, limit=5, sample=5):
+        return self._execute(cypher_shared_neighbors(label, name, rel, target_label, limit, sample))
+
+
+class Neo4jGraphStore(CypherGraphStore):
+    """
+    通过 py2neo 访问 Neo4j
+    未指定 graph 时每次取进程共享的连接，连接重建后自动使用新的连接
+    py2neo 不支持事务超时，请求时限只在查询开始前检查（需要服务器端终止慢查询时使用 driver 后端）
+    """
+
+    backend = 'neo4j'
+
+    def __init__(self, graph=None, cache: Optional[QueryCache] = None):
+        self._graph = graph
+        self._cache = cache
+
+    @property
+    def graph(self):
+        return self._graph if self._graph is not None else get_graph()
+
+    def is_available(self) -> bool:
+        return self.graph is not None
+
+    def _connected_graph(self, query: str):
+        query_timeout(query)
+        graph = self.graph
+        if graph is None:
+            raise ConnectionError("Neo4j 未连接")
+        return graph
+
+    def _data(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        return self._connected_graph(query).run(query, params or {}).data()
+
+    def _rows(self, query: str, params: Optional[Dict] = None) -> List[tuple]:
+        # py2neo 的 Record 本身就是元组
+        return [tuple(r) for r in self._connected_graph(query).run(query, params or {})]
+
+    def iter_intent(self, question_type: str, query: str, params: Dict) -> Iterator[Dict]:
+        for record in self._connected_graph(query).run(query, params or {}):
+            yield record.data()
+
+
+# ---------- 内存 ----------
+
+class MemoryGraphStore(BaseGraphStore):
+    """
+    在 MemoryGraph 上实现 GraphStore，不需要 Neo4j
+    未指定 engine 时首次使用时加载进程共享的内存图谱
+    """
+
+    backend = 'memory'
+
+    def __init__(self, engine=None):
+        self._engine = engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from graphdb.memory_engine import get_memory_graph
+            self._engine = get_memory_graph()
+        return self._engine
+
+    def is_available(self) -> bool:
+        try:
+            return self.engine is not None
+        except Exception as e:
+            logger.error(f"内存图谱加载失败: {e}")
+            return False
+
+    def _adjacency(self, label, rels, other_label, direction):
+        """
+        label 一侧节点出发的 CSR 邻接表
+        返回 [(关系, CSR, 另一端标签)]
+        """
+        types = set(_rel_list(rels))
+        result = []
+        for (start, rel_type, end), relation in self.engine.relations.items():
+            if types and rel_type not in types:
+                continue
+            if direction == 'out' and start == label and (other_label is None or end == other_label):
+                result.append((relation, relation.out, end))
+            elif direction == 'in' and end == label and (other_label is None or start == other_label):
+                result.append((relation, relation.inc, start))
+        # 按传入的关系类型顺序排列，与 Cypher 中多类型匹配的结果保持相近的顺序
+        order = _rel_list(rels)
+        if order:
+            result.sort(key=lambda x: order.index(x[0].rel_type))
+        return result
+
+    def _prop(self, label: str, idx: int, field: str):
+        engine = self.engine
+        if field == 'name':
+            return engine.names[label][idx]
+        if label == 'Disease' and field in engine.disease_attrs:
+            return engine.disease_attrs[field][idx]
+        return None
+
+    def run_intent(self, question_type, query, params):
+        return self.engine.run(question_type, params)
+
+    def iter_intent(self, question_type, query, params):
+        return iter(self.run_intent(question_type, query, params))
+
+    def neighbors(self, label, name, rels, target_label, direction='out', limit=None):
+        idx = self.engine.node_id(label, name)
+        if idx is None:
+            return []
+        names = []
+        for _, csr, other in self._adjacency(label, rels, target_label, direction):
+            other_names = self.engine.names[other]
+            for j in csr.neighbors(idx):
+                names.append(other_names[j])
+                if limit is not None and len(names) >= limit:
+                    return names
+        return names
+
+    def neighbors_by_keyword(self, label, keyword, rels, target_label, direction='out', limit=None):
+        adjacency = self._adjacency(label, rels, target_label, direction)
+        pairs = []
+        for idx, name in enumerate(self.engine.names.get(label, [])):
+            if keyword not in name:
+                continue
+            for _, csr, other in adjacency:
+                other_names = self.engine.names[other]
+                for j in csr.neighbors(idx):
+                    pairs.append((name, other_names[j]))
+                    if limit is not None and len(pairs) >= limit:
+                        return pairs
+        return pairs
+
+    def node_props(self, label, name, fields):
+        idx = self.engine.node_id(label, name)
+        if idx is None:
+            return None
+        return {f: self._prop(label, idx, f) for f in (fields or ['name'])}
+
+    def profile(self, label, name, fields, neighbor_specs):
+        props = self.node_props(label, name, ['name'] + list(fields))
+        if props is None:
+            return None
+        for key, (rels, target_label, limit) in neighbor_specs.items():
+            props[key] = self.neighbors(label, name, rels, target_label, 'out', limit)
+        return props
+
+    def find_names(self, label, keyword, mode='exact', limit=5):
+        names = self.engine.names.get(label, [])
+        if mode == 'exact':
+            return [keyword] if self.engine.node_id(label, keyword) is not None else []
+        if mode == 'contains':
+            found = [n for n in names if keyword in n]
+            found.sort(key=lambda n: (abs(len(n) - len(keyword)), n))
+        elif mode == 'contained':
+            found = [n for n in names if n in keyword]
+            found.sort(key=lambda n: (-len(n), n))
+        else:
+            raise ValueError(f"非法的匹配方式: {mode!r}")
+        return found[:limit]
+
+    def search(self, label, keyword, fields=('name',), limit=5):
+        kw = (keyword or '').lower()
+        found = []
+        for idx, name in enumerate(self.engine.names.get(label, [])):
+            for field in fields:
+                value = self._prop(label, idx, field)
+                if isinstance(value, str) and kw in value.lower():
+                    found.append(name)
+                    break
+            if len(found) >= limit:
+                break
+        return found
+
+    def count_nodes(self, label):
+        return len(self.engine.names.get(label, []))
+
+    def count_rels(self, rel=None):
+        return sum(r.edge_count for r in self.engine.relations.values()
+                   if rel is None or r.rel_type == rel)
+
+    def count_with_rel(self, label, rel):
+        n = self.count_nodes(label)
+        has_rel = np.zeros(n, dtype=bool)
+        for _, csr, _ in self._adjacency(label, rel, None, 'out'):
+            has_rel |= csr.degrees() > 0
+        return int(has_rel.sum())
+
+    def top_by_degree(self, label, rels=None, other_label=None, direction='out', limit=10):
+        names = self.engine.names.get(label, [])
+        degrees = np.zeros(len(names), dtype=np.int64)
+        for _, csr, _ in self._adjacency(label, rels, other_label, direction):
+            degrees += csr.degrees()
+        order = np.argsort(-degrees, kind='stable')[:limit]
+        return [(names[i], int(degrees[i])) for i in order if degrees[i] > 0]
+
+    def shared_neighbors(self, label, name, rel, target_label, limit=5, sample=5):
+        idx = self.engine.node_id(label, name)
+        relation = self.engine.relation(label, rel, target_label)
+        if idx is None or relation is None:
+            return []
+        target_names = self.engine.names[target_label]
+        shared: Dict[int, List[str]] = {}
+        for x in np.unique(relation.out.neighbors(idx)):
+            for other in relation.inc.neighbors(x):
+                if other != idx:
+                    shared.setdefault(int(other), []).append(target_names[x])
+        names = self.engine.names[label]
+        ranked = sorted(shared.items(), key=lambda x: -len(x[1]))[:limit]
+        return [(names[i], len(xs), xs[:sample]) for i, xs in ranked]
+
+
+# ---------- 选择实现 ----------
+
+_stores: Dict[str, GraphStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _create_store(backend: str) -> GraphStore:
+    if backend == 'neo4j':
+        return Neo4jGraphStore()
+    if backend == 'driver':
+        from graphdb.driver_store import DriverGraphStore
+        return DriverGraphStore()
+    if backend == 'memory':
+        return MemoryGraphStore()
+    raise ValueError(f"未知的图存储后端: {backend}（可选 neo4j / driver / memory）")
+
+
+def get_store(backend: Optional[str] = None) -> GraphStore:
+    """
+    获取进程共享的图存储
+    backend 未指定时取环境变量 MEDQA_GRAPH_BACKEND，默认 neo4j
+    """
+    backend = (backend or os.getenv('MEDQA_GRAPH_BACKEND', 'neo4j')).strip().lower()
+    store = _stores.get(backend)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(backend)
+            if store is None:
+                store = _create_store(backend)
+                _stores[backend] = store
+                logger.info(f"图存储后端: {backend}")
+    return store
@@ -4,27 +4,81 @@
 增加了答案模板
 更友好的回答模式
 
+多个意图的查询在进程共享的线程池中并发执行：
+- 超过请求时限仍未完成的查询被放弃，但无法中途取消，会继续占用工作线程直到返回；
+  driver 后端把剩余时限作为事务超时交给服务器，慢查询由服务器终止，
+  neo4j（py2neo）后端不支持事务超时，慢查询会一直执行到结束
+- 只有空闲的工作线程才接收新查询，线程池被放弃的查询占满时，其余意图在请求线程中依次执行，
+  不会排在旧查询后面等到时限用完
+
 """
-from py2neo import Graph
+import contextvars
+import os
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from graphdb.deadline import request_deadline
+from graphdb.store import get_store
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 所有 AnswerSearcher 共用一个有上限的查询线程池，避免会话数增长时线程数失控
+# _idle_workers 记录空闲的工作线程数，查询只提交给空闲线程，不在线程池中排队
+_executor = None
+_idle_workers = None
+_executor_lock = threading.Lock()
 
-class AnswerSearcher:
-    def __init__(self):
-        # 初始化 Neo4j 连接
-        from os import getenv
-        neo_url = getenv('NEO4J_BOLT_URL', 'bolt://localhost:7687')
-        neo_user = getenv('NEO4J_USER', 'neo4j')
-        neo_pass = getenv('NEO4J_PASSWORD', '此处填入密码')
+
+# 反查类意图（已知食物/药品/检查查疾病）对常见实体可能返回成千上万行，
+# 而回答最多只展示 num_limit 个疾病：逐行读取，凑够之后就停止
+STREAM_INTENTS = {
+    'food_not_disease': 'm.name',
+    'food_do_disease': 'm.name',
+    'drug_disease': 'm.name',
+    'check_disease': 'm.name',
+}
+
+
+def _get_executor(max_workers):
+    global _executor, _idle_workers
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _idle_workers = threading.BoundedSemaphore(max_workers)
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='answer-search')
+    return _executor
+
+
+def _submit_if_idle(func, *args):
+    """有空闲工作线程时提交 func 并返回 Future，否则返回 None"""
+    if not _idle_workers.acquire(blocking=False):
+        return None
+
+    def run():
         try:
-            self.g = Graph(neo_url, auth=(neo_user, neo_pass))
-        except Exception as e:
-            logger.error(f"无法连接到 Neo4j: {e}")
-            self.g = None
+            return func(*args)
+        finally:
+            _idle_workers.release()
+
+    try:
+        return _executor.submit(run)
+    except BaseException:
+        _idle_workers.release()
+        raise
+
+
+class AnswerSearcher:
+    def __init__(self, store=None):
+        """
+        store: 图存储（graphdb.store.GraphStore），默认按 MEDQA_GRAPH_BACKEND 选择进程共享的实现
+        """
+        self.store = store if store is not None else get_store()
         self.num_limit = 20
+        # 多个意图的查询是否并发执行，以及单个请求的总时限（秒）
+        self.concurrent = os.getenv('MEDQA_CONCURRENT_SEARCH', '1') != '0'
+        self.max_workers = int(os.getenv('MEDQA_SEARCH_WORKERS', '8'))
+        self.request_timeout = float(os.getenv('MEDQA_REQUEST_TIMEOUT', '5'))
         
         # 多样化回复模板
         self.templates = {
@@ -142,25 +196,34 @@ class AnswerSearcher:
             ]
         }
 
-    def search_main(self, sqls):
-        """执行cypher查询，并返回相应结果"""
-        if not self.g:
-            logger.error("Neo4j 未初始化，（AnswerSearcher.g is None）")
+    def search_main(self, sqls, timeout=None):
+        """
+        执行cypher查询，并返回相应结果
+        timeout: 整个请求的时限（秒），默认 self.request_timeout；已在请求时限内时取两者中较早的
+        每条查询的事务超时由剩余时限决定，超时未完成的意图直接跳过
+        """
+        if not self.store.is_available():
+            logger.error(f"图存储不可用（{self.store.backend}）")
             return []
+        with request_deadline(timeout if timeout is not None else self.request_timeout) as budget:
+            if self.concurrent and len(sqls) > 1:
+                results = self._search_concurrent(sqls, budget)
+            else:
+                results = []
+                for sql_ in sqls:
+                    if budget.expired:
+                        budget.record(sql_['question_type'], 'skipped')
+                        results.append(None)
+                        continue
+                    results.append(self._run_queries(sql_))
+
         final_answers = []
         seen_answer_keys = set() # 用于去重
-        for sql_ in sqls:
+        # 按意图原有顺序组装答案，超时的意图结果为 None
+        for sql_, answers in zip(sqls, results):
+            if answers is None:
+                continue
             question_type = sql_['question_type']
-            queries = sql_['sql']
-            answers = []
-            for query in queries:
-                try:
-                    ress = self.g.run(query).data()
-                    answers += ress
-                    if not ress and question_type == 'symptom_disease':
-                        logger.warning(f"症状查询结果为空，查询语句: {query}")
-                except Exception as e:
-                    logger.error(f"查询错误: {e}, 查询语句: {query}")
             final_answer = self.answer_prettify(question_type, answers)
             if final_answer:
                 # 基于答案的关键内容生成去重key
@@ -169,6 +232,67 @@ class AnswerSearcher:
                     seen_answer_keys.add(answer_key)
                     final_answers.append(final_answer)
         return final_answers
+
+    def _run_queries(self, sql_):
+        """执行一个意图下的全部查询，返回合并后的行"""
+        question_type = sql_['question_type']
+        answers = []
+        # 每条查询是 (模板, 参数)，实体名通过参数传入
+        for query, params in sql_['sql']:
+            try:
+                if question_type in STREAM_INTENTS:
+                    ress = self._take_distinct(self.store.iter_intent(question_type, query, params),
+                                               STREAM_INTENTS[question_type], self.num_limit)
+                else:
+                    ress = self.store.run_intent(question_type, query, params)
+                answers += ress
+                if not ress and question_type == 'symptom_disease':
+                    logger.warning(f"症状查询结果为空，查询语句: {query}, 参数: {params}")
+            except Exception as e:
+                logger.error(f"查询错误: {e}, 查询语句: {query}, 参数: {params}")
+        return answers
+
+    @staticmethod
+    def _take_distinct(rows, key, limit):
+        """从行迭代器中读取，直到 key 列出现 limit 个不同的值"""
+        taken = []
+        seen = set()
+        for row in rows:
+            value = row.get(key)
+            if value not in seen:
+                if len(seen) >= limit:
+                    break
+                seen.add(value)
+            taken.append(row)
+        if hasattr(rows, 'close'):
+            rows.close()
+        return taken
+
+    def _search_concurrent(self, sqls, budget):
+        """
+        各意图的查询互不依赖，提交给空闲的工作线程并发执行，只收集时限内完成的结果
+        没有空闲线程时（被之前请求放弃的慢查询占满）在当前线程中依次执行
+        工作线程在提交时的上下文中运行，查询能取到同一个请求时限
+        """
+        _get_executor(self.max_workers)
+        futures = [_submit_if_idle(contextvars.copy_context().run, self._run_queries, sql_) for sql_ in sqls]
+        results = [None] * len(sqls)
+        for i, (sql_, future) in enumerate(zip(sqls, futures)):
+            if future is not None:
+                continue
+            if budget.expired:
+                budget.record(sql_['question_type'], 'skipped')
+                continue
+            results[i] = self._run_queries(sql_)
+        wait([f for f in futures if f is not None], timeout=budget.remaining())
+        for i, (sql_, future) in enumerate(zip(sqls, futures)):
+            if future is None:
+                continue
+            if future.done():
+                results[i] = future.result()
+            else:
+                budget.record(sql_['question_type'], 'abandoned')
+        return results
     
     def _generate_answer_key(self, question_type, answers):
         """生成答案的key用于去重"""
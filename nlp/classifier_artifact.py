@@ -0,0 +1,176 @@
+"""
+问题分类器的预编译产物
+
+- QuestionClassifier 从 dict/*.txt 读取约 4.4 万个特征词，构造类型表和 Aho-Corasick 自动机
+- 构建脚本在生成词典的同时把这些结果编译好，pickle 到 dict/classifier.pkl
+- 产物中记录编译时各词典文件的 SHA-1，词典被修改后产物即视为过期
+- 所有文件先写到与 dict 同一文件系统上的临时目录，完成后逐个原子替换，产物最后替换：
+  产物可见时，编译它所用的词典已经就位
+- QuestionClassifier 启动时用 load_artifact 加载（只需计算词典哈希和反序列化，毫秒级），
+  产物缺失、格式不符或词典哈希不一致时重新编译，并用 save_artifact 写回
+
+使用方法：
+    from nlp.classifier_artifact import compile_artifact, write_artifact
+    write_artifact(compile_artifact('dict'), 'dict/classifier.pkl')
+
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 项目根目录下的词典目录
+DICT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dict')
+
+# 实体词典：由构建脚本从数据生成，(实体类型, 文件名)
+ENTITY_DICTS = [
+    ('disease', 'disease.txt'),
+    ('department', 'department.txt'),
+    ('check', 'check.txt'),
+    ('drug', 'drug.txt'),
+    ('food', 'food.txt'),
+    ('producer', 'producer.txt'),
+    ('symptom', 'symptom.txt'),
+]
+
+# 人工维护的词典，构建时原样保留
+MANUAL_DICTS = ['deny.txt', 'synonym.txt']
+
+DICT_FILES = [file_name for _, file_name in ENTITY_DICTS] + MANUAL_DICTS
+
+ARTIFACT_FILE = 'classifier.pkl'
+
+# 产物格式版本，QuestionClassifier 的编译结果结构变化时加一
+ARTIFACT_FORMAT = 3
+
+# 编译后保存的 QuestionClassifier 属性
+COMPILED_ATTRS = [
+    'disease_wds', 'department_wds', 'check_wds', 'drug_wds', 'food_wds', 'producer_wds', 'symptom_wds',
+    'synonym_map', 'synonym_tree', 'deny_words', 'region_tree', 'wdtype_mask',
+]
+
+
+def artifact_path(dict_dir=None):
+    return os.path.join(dict_dir or DICT_DIR, ARTIFACT_FILE)
+
+
+def file_hash(path):
+    """文件内容的 SHA-1，文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dict_hashes(dict_dir=None):
+    """各词典文件的 SHA-1，作为产物的键"""
+    dict_dir = dict_dir or DICT_DIR
+    return {file_name: file_hash(os.path.join(dict_dir, file_name)) for file_name in DICT_FILES}
+
+
+def _artifact(classifier, hashes):
+    return {
+        'format': ARTIFACT_FORMAT,
+        'dict_hashes': hashes,
+        'state': {attr: getattr(classifier, attr) for attr in COMPILED_ATTRS},
+    }
+
+
+def compile_artifact(dict_dir=None):
+    """按 dict_dir 中的词典构造分类器，返回可 pickle 的编译结果"""
+    from nlp.question_classifier import QuestionClassifier
+    dict_dir = dict_dir or DICT_DIR
+    # 先计算哈希再读词典：编译期间词典被修改时，产物会在下次加载时被判定为过期
+    hashes = dict_hashes(dict_dir)
+    return _artifact(QuestionClassifier(dict_dir=dict_dir, use_artifact=False), hashes)
+
+
+def load_artifact(dict_dir=None):
+    """
+    读取与当前词典一致的编译结果（QuestionClassifier 的属性字典）
+    产物不存在、无法读取、格式版本不同或任一词典的哈希不一致时返回 None
+    """
+    dict_dir = dict_dir or DICT_DIR
+    path = artifact_path(dict_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            artifact = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"分类器产物无法读取，重新编译: {e}")
+        return None
+    if not isinstance(artifact, dict) or artifact.get('format') != ARTIFACT_FORMAT:
+        logger.info("分类器产物格式版本不同，重新编译")
+        return None
+    stale = [name for name, digest in dict_hashes(dict_dir).items() if artifact['dict_hashes'].get(name) != digest]
+    if stale:
+        logger.info(f"词典已修改（{', '.join(stale)}），重新编译分类器")
+        return None
+    return artifact['state']
+
+
+def save_artifact(classifier, hashes, dict_dir=None):
+    """
+    把 QuestionClassifier 的编译结果写成产物，hashes 是编译前计算的词典哈希
+    写入失败（如目录只读）只记录警告
+    """
+    dict_dir = dict_dir or DICT_DIR
+    try:
+        write_artifact(_artifact(classifier, hashes), artifact_path(dict_dir))
+        logger.info(f"分类器产物已更新: {artifact_path(dict_dir)}")
+    except Exception as e:
+        logger.warning(f"分类器产物写入失败: {e}")
+
+
+def write_artifact(artifact, path):
+    """先写临时文件再原子替换"""
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _write_words(path, words):
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(''.join(word + '\n' for word in words))
+
+
+def publish_dicts(words_by_type, dict_dir=None):
+    """
+    用新的实体词表替换 dict_dir 中的实体词典，并编译、替换分类器产物
+    words_by_type: 实体类型 -> 词列表；人工维护的词典（否定词、同义词）沿用 dict_dir 中现有的
+    任何一步失败时 dict_dir 保持不变；返回 {文件名: 词数}
+    """
+    dict_dir = dict_dir or DICT_DIR
+    os.makedirs(dict_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.dict-', dir=os.path.dirname(os.path.abspath(dict_dir)))
+    try:
+        counts = {}
+        for entity_type, file_name in ENTITY_DICTS:
+            words = sorted({word.strip() for word in words_by_type.get(entity_type, ()) if word and word.strip()})
+            _write_words(os.path.join(staging, file_name), words)
+            counts[file_name] = len(words)
+        for file_name in MANUAL_DICTS:
+            if os.path.exists(os.path.join(dict_dir, file_name)):
+                shutil.copyfile(os.path.join(dict_dir, file_name), os.path.join(staging, file_name))
+        write_artifact(compile_artifact(staging), os.path.join(staging, ARTIFACT_FILE))
+        for _, file_name in ENTITY_DICTS:
+            os.replace(os.path.join(staging, file_name), os.path.join(dict_dir, file_name))
+        os.replace(os.path.join(staging, ARTIFACT_FILE), artifact_path(dict_dir))
+        return counts
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
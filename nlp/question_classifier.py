@@ -1,47 +1,98 @@
 """
 实体识别和意图分类
 
+词典的编译结果（类型表、自动机、同义词表）优先从预编译产物 dict/classifier.pkl 加载（见 nlp/classifier_artifact.py），
+产物缺失或词典已修改时从 dict/*.txt 重新编译并写回产物
+
+分类器构造后只读，整个进程共用一个实例：
+    from nlp.question_classifier import get_classifier
+    get_classifier().classify('感冒吃什么药')
+
 """
 import os
+import threading
 import ahocorasick
+from nlp import classifier_artifact
+
+# 实体类型及其在类型掩码中的位（第 i 个类型为 1 << i），顺序即 check_medical 返回的类型列表的顺序
+WORD_TYPES = ['disease', 'department', 'check', 'drug', 'food', 'symptom', 'producer']
+# 类型掩码 -> 类型列表
+MASK_TYPES = [[tp for i, tp in enumerate(WORD_TYPES) if mask >> i & 1] for mask in range(1 << len(WORD_TYPES))]
+# 自动机中每个词的值：低位是类型掩码，高位是词长（由匹配的结束位置还原出词）
+MASK_BITS = 8
+
+# 意图线索词表（QuestionClassifier 的属性名）及其在线索掩码中的位：一次扫描问句得到所有命中的词表
+CUE_LISTS = [
+    'symptom_qwds', 'cause_qwds', 'acompany_qwds', 'food_qwds', 'drug_qwds', 'prevent_qwds', 'lasttime_qwds',
+    'cureway_qwds', 'cureprob_qwds', 'easyget_qwds', 'check_qwds', 'belong_qwds', 'drug_disease_qwds',
+    'producer_qwds', 'cure_qwds', 'deny_words',
+]
+CUE = {name: 1 << i for i, name in enumerate(CUE_LISTS)}
 
 class QuestionClassifier:
-    def __init__(self):
+    def __init__(self, dict_dir=None, use_artifact=True):
         # 获取根目录
         cur_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # 词典目录，默认项目根目录下的 dict（构建脚本在临时目录中编译新词典时传入）
+        dict_dir = dict_dir or os.path.join(cur_dir, 'dict')
         # 特征词路径
-        self.disease_path = os.path.join(cur_dir, 'dict', 'disease.txt')
-        self.department_path = os.path.join(cur_dir, 'dict', 'department.txt')
-        self.check_path = os.path.join(cur_dir, 'dict', 'check.txt')
-        self.drug_path = os.path.join(cur_dir, 'dict', 'drug.txt')
-        self.food_path = os.path.join(cur_dir, 'dict', 'food.txt')
-        self.producer_path = os.path.join(cur_dir, 'dict', 'producer.txt')
-        self.symptom_path = os.path.join(cur_dir, 'dict', 'symptom.txt')
-        self.deny_path = os.path.join(cur_dir, 'dict', 'deny.txt')
-        # 加载特征词
-        self.disease_wds= [i.strip() for i in open(self.disease_path,encoding="utf-8") if i.strip()]#encoding="utf-8"
-        self.department_wds= [i.strip() for i in open(self.department_path,encoding="utf-8") if i.strip()]
-        self.check_wds= [i.strip() for i in open(self.check_path,encoding="utf-8") if i.strip()]
-        self.drug_wds= [i.strip() for i in open(self.drug_path,encoding="utf-8") if i.strip()]
-        self.food_wds= [i.strip() for i in open(self.food_path,encoding="utf-8") if i.strip()]
-        self.producer_wds= [i.strip() for i in open(self.producer_path,encoding="utf-8") if i.strip()]
-        self.symptom_wds= [i.strip() for i in open(self.symptom_path,encoding="utf-8") if i.strip()]
+        self.disease_path = os.path.join(dict_dir, 'disease.txt')
+        self.department_path = os.path.join(dict_dir, 'department.txt')
+        self.check_path = os.path.join(dict_dir, 'check.txt')
+        self.drug_path = os.path.join(dict_dir, 'drug.txt')
+        self.food_path = os.path.join(dict_dir, 'food.txt')
+        self.producer_path = os.path.join(dict_dir, 'producer.txt')
+        self.symptom_path = os.path.join(dict_dir, 'symptom.txt')
+        self.deny_path = os.path.join(dict_dir, 'deny.txt')
         # 同义词文件
-        self.synonym_path = os.path.join(cur_dir, 'dict', 'synonym.txt')
+        self.synonym_path = os.path.join(dict_dir, 'synonym.txt')
+        # 加载词典的编译结果：产物与词典一致时直接加载，否则重新编译并写回
+        state = classifier_artifact.load_artifact(dict_dir) if use_artifact else None
+        if state is not None:
+            self.__dict__.update(state)
+        else:
+            hashes = classifier_artifact.dict_hashes(dict_dir)
+            self.compile_dicts()
+            if use_artifact:
+                classifier_artifact.save_artifact(self, hashes, dict_dir)
+        # 问句疑问词
+        self.init_question_words()
+
+    '''从 dict/*.txt 加载特征词，构造类型表和自动机'''
+    def compile_dicts(self):
+        # 加载特征词
+        self.disease_wds= self.load_words(self.disease_path)
+        self.department_wds= self.load_words(self.department_path)
+        self.check_wds= self.load_words(self.check_path)
+        self.drug_wds= self.load_words(self.drug_path)
+        self.food_wds= self.load_words(self.food_path)
+        self.producer_wds= self.load_words(self.producer_path)
+        self.symptom_wds= self.load_words(self.symptom_path)
         self.synonym_map = self._load_synonym_map()
-        # 按长度降序排列同义词，优先替换长词避免部分匹配
-        self._synonym_keys_sorted = sorted(self.synonym_map.keys(), key=lambda x: len(x), reverse=True)
-        self.region_words = set(self.department_wds + self.disease_wds + self.check_wds + self.drug_wds + self.food_wds + self.producer_wds + self.symptom_wds)
+        # 同义词自动机，按最左最长匹配替换
+        self.synonym_tree = self.build_synonym_tree()
         self.deny_words = [i.strip() for i in open(self.deny_path,encoding="utf-8") if i.strip()]
         # 确保否定词包含关键项
         for _w in ['不适合', '不能', '忌']:
             if _w not in self.deny_words:
                 self.deny_words.append(_w)
-        # 构造领域actree
-        self.region_tree = self.build_actree(list(self.region_words))
         # 构建词典
-        self.wdtype_dict = self.build_wdtype_dict()
-        # 问句疑问词
+        self.wdtype_mask = self.build_wdtype_dict()
+        # 构造领域actree
+        self.region_tree = self.build_actree(self.wdtype_mask)
+
+    '''读取词典文件，每行一个词'''
+    def load_words(self, path):
+        with open(path, encoding="utf-8") as f:
+            return [i.strip() for i in f if i.strip()]
+
+    '''领域词（各类实体词典的并集）'''
+    @property
+    def region_words(self):
+        return self.wdtype_mask.keys()
+
+    '''问句疑问词'''
+    def init_question_words(self):
         self.symptom_qwds = [
             '症状', '表征', '现象', '症候', '表现', '哪些病', '什么病', '可能是什么病', '常见于', '会是什么病',
             '不舒服', '哪里不对劲', '异常', '表现为', '症状有哪些', '症状是啥', '表现症状', '体征', '临床表现',
@@ -144,6 +195,9 @@ class QuestionClassifier:
             '起什么作用', '用于什么', '功用', '用途是什么', '作用是啥', '有什么效果'
         ]
 
+        # 所有线索词编进一个自动机，值为包含该词的词表的掩码
+        self.cue_tree = self.build_cue_tree()
+
         return
 
     '''分类主函数'''
@@ -153,15 +207,17 @@ class QuestionClassifier:
         if not medical_dict:
             return {}
         data['args'] = medical_dict
+        # 问句命中的线索词表
+        cues = self.check_cues(question)
 
         # 遍历 medical_dict，处理 disease/symptom 混合类型
         disambiguated_dict = {}
         for wd, types in medical_dict.items():
             # 如果既是疾病又是症状
             if 'disease' in types and 'symptom' in types:
-                if self.check_words(self.symptom_qwds, question):
+                if cues & CUE['symptom_qwds']:
                     disambiguated_dict[wd] = ['symptom']
-                elif self.check_words(self.cureway_qwds, question):
+                elif cues & CUE['cureway_qwds']:
                     disambiguated_dict[wd] = ['disease']
                 else:
                     disambiguated_dict[wd] = types
@@ -188,29 +244,29 @@ class QuestionClassifier:
             question_types.append('symptom_disease')
 
         # 症状查疾病（优先处理症状且无疾病时）
-        if self.check_words(self.symptom_qwds, question) and ('symptom' in types):
+        if cues & CUE['symptom_qwds'] and ('symptom' in types):
             if 'symptom_disease' not in question_types:
                 question_types.append('symptom_disease')
         # 疾病查症状
-        if self.check_words(self.symptom_qwds, question) and ('disease' in types):
+        if cues & CUE['symptom_qwds'] and ('disease' in types):
             question_types.append('disease_symptom')
         
         # 药品相关：查药品对应的疾病、查生产厂家
         if 'drug' in types:
-            if hasattr(self, 'drug_disease_qwds') and self.check_words(self.drug_disease_qwds, question):
+            if cues & CUE['drug_disease_qwds']:
                 question_types.append('drug_disease')
             
-            if hasattr(self, 'producer_qwds') and self.check_words(self.producer_qwds, question):
+            if cues & CUE['producer_qwds']:
                 question_types.append('drug_producer')
         # 原因
-        if self.check_words(self.cause_qwds, question) and ('disease' in types):
+        if cues & CUE['cause_qwds'] and ('disease' in types):
             question_types.append('disease_cause')
         # 并发症
-        if self.check_words(self.acompany_qwds, question) and ('disease' in types):
+        if cues & CUE['acompany_qwds'] and ('disease' in types):
             question_types.append('disease_acompany')
         # 推荐食品
-        if self.check_words(self.food_qwds, question) and 'disease' in types:
-            deny_status = self.check_words(self.deny_words, question)
+        if cues & CUE['food_qwds'] and 'disease' in types:
+            deny_status = cues & CUE['deny_words']
             if deny_status:
                 question_types.append('disease_not_food')
             else:
@@ -218,40 +274,40 @@ class QuestionClassifier:
         # 已知食物找疾病
         # 如果识别出 food 实体，则根据否定词决定方向）
         if 'food' in types:
-            if self.check_words(self.deny_words, question):
+            if cues & CUE['deny_words']:
                 question_types.append('food_not_disease')
             else:
-                if self.check_words(self.cure_qwds + self.food_qwds, question):
+                if cues & (CUE['cure_qwds'] | CUE['food_qwds']):
                     question_types.append('food_do_disease')
         # 推荐药品
-        if self.check_words(self.drug_qwds, question) and 'disease' in types:
+        if cues & CUE['drug_qwds'] and 'disease' in types:
             question_types.append('disease_drug')
         # 药品治啥病
-        if self.check_words(self.cure_qwds, question) and 'drug' in types:
+        if cues & CUE['cure_qwds'] and 'drug' in types:
             question_types.append('drug_disease')
         # 疾病接受检查项目
-        if self.check_words(self.check_qwds, question) and 'disease' in types:
+        if cues & CUE['check_qwds'] and 'disease' in types:
             question_types.append('disease_check')
         # 已知检查项目查相应疾病
-        if self.check_words(self.check_qwds+self.cure_qwds, question) and 'check' in types:
+        if cues & (CUE['check_qwds'] | CUE['cure_qwds']) and 'check' in types:
             question_types.append('check_disease')
         #　症状预防
-        if self.check_words(self.prevent_qwds, question) and 'disease' in types:
+        if cues & CUE['prevent_qwds'] and 'disease' in types:
             question_types.append('disease_prevent')
         # 疾病医疗周期
-        if self.check_words(self.lasttime_qwds, question) and 'disease' in types:
+        if cues & CUE['lasttime_qwds'] and 'disease' in types:
             question_types.append('disease_lasttime')
         # 疾病治疗方式
-        if self.check_words(self.cureway_qwds, question) and 'disease' in types:
+        if cues & CUE['cureway_qwds'] and 'disease' in types:
             question_types.append('disease_cureway')
         # 疾病治愈可能性
-        if self.check_words(self.cureprob_qwds, question) and 'disease' in types:
+        if cues & CUE['cureprob_qwds'] and 'disease' in types:
             question_types.append('disease_cureprob')
         # 疾病易感染人群
-        if self.check_words(self.easyget_qwds, question) and 'disease' in types:
+        if cues & CUE['easyget_qwds'] and 'disease' in types:
             question_types.append('disease_easyget')
         # 挂号科室
-        if self.check_words(self.belong_qwds, question) and 'disease' in types:
+        if cues & CUE['belong_qwds'] and 'disease' in types:
             question_types.append('disease_department')
 
         # 若没有查到相关的外部查询信息
@@ -266,26 +322,15 @@ class QuestionClassifier:
         data['question_types'] = question_types
         return data
 
-    '''构造词对应的类型'''
+    '''构造词对应的类型：一次遍历各类词表，按位或得到每个词的类型掩码（位的含义见 WORD_TYPES）'''
     def build_wdtype_dict(self):
-        wd_dict = dict()
-        for wd in self.region_words:
-            wd_dict[wd] = []
-            if wd in self.disease_wds:
-                wd_dict[wd].append('disease')
-            if wd in self.department_wds:
-                wd_dict[wd].append('department')
-            if wd in self.check_wds:
-                wd_dict[wd].append('check')
-            if wd in self.drug_wds:
-                wd_dict[wd].append('drug')
-            if wd in self.food_wds:
-                wd_dict[wd].append('food')
-            if wd in self.symptom_wds:
-                wd_dict[wd].append('symptom')
-            if wd in self.producer_wds:
-                wd_dict[wd].append('producer')
-        return wd_dict
+        wd_masks = dict()
+        for bit, wds in enumerate([self.disease_wds, self.department_wds, self.check_wds, self.drug_wds,
+                                   self.food_wds, self.symptom_wds, self.producer_wds]):
+            flag = 1 << bit
+            for wd in wds:
+                wd_masks[wd] = wd_masks.get(wd, 0) | flag
+        return wd_masks
 
     def _load_synonym_map(self):
         """从同义词文件加载映射：同义词 -> 标准词"""
@@ -309,49 +354,96 @@ class QuestionClassifier:
             return {}
         return syn_map
 
+    def build_synonym_tree(self):
+        """同义词自动机：值为 (同义词长度, 标准词)；标准词也作为键，避免其中较短的同义词被再次替换"""
+        if not self.synonym_map:
+            return None
+        actree = ahocorasick.Automaton()
+        for syn, std in self.synonym_map.items():
+            actree.add_word(syn, (len(syn), std))
+        actree.make_automaton()
+        return actree
+
     def expand_synonyms(self, text: str) -> str:
         """
         将输入文本中的同义词替换为标准词并返回。
+        从左到右扫描一遍，每个位置取最长的同义词（最左最长匹配），替换后的文本不会再被替换。
         """
         if not text:
             return text
-        if not getattr(self, 'synonym_map', None):
+        if getattr(self, 'synonym_tree', None) is None:
             return text
-        result = text
-        for syn in self._synonym_keys_sorted:
-            if syn in result:
-                std = self.synonym_map.get(syn, syn)
-                result = result.replace(syn, std)
-        return result
-
-    '''构造actree，加速过滤'''
-    def build_actree(self, wordlist):
-        actree = ahocorasick.Automaton()
-        for index, word in enumerate(wordlist):
-            actree.add_word(word, (index, word))
+        # 每个起点只保留最长的匹配；Automaton.iter_long 在较长的候选中途失配时会丢掉已经越过的较短匹配，不能直接用
+        longest = {}
+        for end, (length, std) in self.synonym_tree.iter(text):
+            start = end - length + 1
+            if length > longest.get(start, (0, None))[0]:
+                longest[start] = (length, std)
+        if not longest:
+            return text
+        parts = []
+        last = 0
+        for start in sorted(longest):
+            if start < last:
+                continue
+            length, std = longest[start]
+            parts.append(text[last:start])
+            parts.append(std)
+            last = start + length
+        parts.append(text[last:])
+        return ''.join(parts)
+
+    '''构造actree，加速过滤；值为整数（类型掩码 | 词长 << MASK_BITS），pickle 后体积小、加载快'''
+    def build_actree(self, wd_masks):
+        actree = ahocorasick.Automaton(ahocorasick.STORE_INTS)
+        for word, mask in wd_masks.items():
+            actree.add_word(word, mask | len(word) << MASK_BITS)
         actree.make_automaton()
         return actree
 
-    '''问句过滤'''
+    '''问句过滤：返回 {词: 类型列表}，按词在问句中出现的顺序'''
     def check_medical(self, question):
-        region_wds = []
-        for i in self.region_tree.iter(question):
-            wd = i[1][1]
-            region_wds.append(wd)
-    # 保留所有类型，不去重
+        low = (1 << MASK_BITS) - 1
         final_dict = {}
-        for wd in region_wds:
-            types = self.wdtype_dict.get(wd)
-            if types:
-                final_dict[wd] = types
+        for end, value in self.region_tree.iter(question):
+            wd = question[end - (value >> MASK_BITS) + 1:end + 1]
+            # 保留所有类型，不去重
+            final_dict[wd] = list(MASK_TYPES[value & low])
         return final_dict
 
-    '''基于特征词进行分类'''
-    def check_words(self, wds, sent):
-        for wd in wds:
-            if wd in sent:
-                return True
-        return False
+    '''构造线索词自动机：值为包含该词的词表的掩码（位的含义见 CUE_LISTS）'''
+    def build_cue_tree(self):
+        cue_masks = {}
+        for name in CUE_LISTS:
+            for wd in getattr(self, name):
+                if wd:
+                    cue_masks[wd] = cue_masks.get(wd, 0) | CUE[name]
+        actree = ahocorasick.Automaton(ahocorasick.STORE_INTS)
+        for wd, mask in cue_masks.items():
+            actree.add_word(wd, mask)
+        actree.make_automaton()
+        return actree
+
+    '''一次扫描问句，返回命中的线索词表的掩码；cues & CUE['food_qwds'] 非零当且仅当 self.food_qwds 中有词出现在问句中'''
+    def check_cues(self, question):
+        cues = 0
+        for _, mask in self.cue_tree.iter(question):
+            cues |= mask
+        return cues
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """获取进程共享的 QuestionClassifier，首次调用时加载；并发的首次调用只构造一次，构造失败时下次调用重试"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = QuestionClassifier()
+    return _classifier
 
 
 if __name__ == '__main__':
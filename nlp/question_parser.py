@@ -1,7 +1,7 @@
 """
 问题解析
 
-- 将分类结果转换为Cypher查询语句
+- 将分类结果转换为参数化的Cypher查询（模板 + 参数）
 - 根据问题类型生成对应的Neo4j查询
 
 """
@@ -111,148 +111,154 @@ class QuestionPaser:
 
     '''针对不同的问题，分开进行处理'''
     def sql_transfer(self, question_type, entities):
+        """
+        返回 (查询模板, 参数) 列表
+        实体名只通过参数传入，同一意图的查询文本固定，Neo4j 可以复用执行计划
+        同一意图的多个实体通过 UNWIND $names 合并成一条查询，往返次数只和意图数有关
+        """
+        entities = [e for e in (entities or []) if e]
         if not entities:
             return []
-        sql = []
+        params = {'names': entities}
+        sql = ''
 
         # 查询疾病的原因
         if question_type == 'disease_cause':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.cause".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.cause"
 
         # 查询疾病的预防措施
         elif question_type == 'disease_prevent':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.prevent".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.prevent"
 
         # 查询疾病的持续时间
         elif question_type == 'disease_lasttime':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.cure_lasttime".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.cure_lasttime"
 
         # 查询疾病的治愈概率
         elif question_type == 'disease_cureprob':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.cured_prob".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.cured_prob"
 
         # 查询疾病的治疗方式
         elif question_type == 'disease_cureway':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.cure_way".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.cure_way"
         
         # 查询症状对应的疾病的治疗方式（症状+怎么办）
         elif question_type == 'symptom_cureway':
-            symptoms = [e for e in entities if e]
-            if symptoms:
-                symptom_list = ", ".join(["'{}'".format(s) for s in symptoms])
-                sql = [
-                    f"""
-                    MATCH (m:Disease)-[r:has_symptom]->(n:Symptom)
-                    WHERE n.name IN [{symptom_list}]
-                    WITH m, count(n) as match_count, collect(n.name) as matched_symptoms
-                    MATCH (m)-[:has_symptom]->(allS:Symptom)
-                    WITH m, match_count, matched_symptoms, count(allS) AS total_sym_count
-                    ORDER BY match_count DESC, total_sym_count ASC
-                    LIMIT 8
-                    RETURN m.name, m.cure_way, matched_symptoms, match_count
-                    """
-                ]
+            sql = """
+                MATCH (m:Disease)-[r:has_symptom]->(n:Symptom)
+                WHERE n.name IN $names
+                WITH m, count(n) as match_count, collect(n.name) as matched_symptoms
+                MATCH (m)-[:has_symptom]->(allS:Symptom)
+                WITH m, match_count, matched_symptoms, count(allS) AS total_sym_count
+                ORDER BY match_count DESC, total_sym_count ASC
+                LIMIT 8
+                RETURN m.name, m.cure_way, matched_symptoms, match_count
+            """
 
         # 查询疾病的易发人群
         elif question_type == 'disease_easyget':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.easy_get".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.easy_get"
 
         # 查询疾病的相关介绍
         elif question_type == 'disease_desc':
-            sql = ["MATCH (m:Disease) where m.name = '{0}' return m.name, m.desc".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease) where m.name = name return m.name, m.desc"
 
         # 查询疾病有哪些症状
         elif question_type == 'disease_symptom':
-            sql = ["MATCH (m:Disease)-[r:has_symptom]->(n:Symptom) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:has_symptom]->(n:Symptom) where m.name = name return m.name, r.name, n.name"
 
         # 查询症状会导致哪些疾病（多症状组合查询）
-        if question_type == 'symptom_disease':
-            # 多症状合并到一个SQL
-            symptoms = [e for e in entities if e]
-            if symptoms:
-                symptom_list = ", ".join(["'{}'".format(s) for s in symptoms])
-                sql = [
-                    f"""
-                    MATCH (m:Disease)-[r:has_symptom]->(n:Symptom)
-                    WHERE n.name IN [{symptom_list}]
-                    WITH m, count(n) as match_count, collect(n.name) as matched_symptoms
-                    MATCH (m)-[:has_symptom]->(allS:Symptom)
-                    WITH m, match_count, matched_symptoms, count(allS) AS total_sym_count
-                    ORDER BY match_count DESC, total_sym_count ASC
-                    LIMIT 8
-                    RETURN m.name, matched_symptoms, match_count
-                    """
-                ]
-        # 查询疾病的并发症
+        elif question_type == 'symptom_disease':
+            sql = """
+                MATCH (m:Disease)-[r:has_symptom]->(n:Symptom)
+                WHERE n.name IN $names
+                WITH m, count(n) as match_count, collect(n.name) as matched_symptoms
+                MATCH (m)-[:has_symptom]->(allS:Symptom)
+                WITH m, match_count, matched_symptoms, count(allS) AS total_sym_count
+                ORDER BY match_count DESC, total_sym_count ASC
+                LIMIT 8
+                RETURN m.name, matched_symptoms, match_count
+            """
+
+        # 查询疾病的并发症（两个方向，先出边后入边，与分开查询时的行顺序一致）
         elif question_type == 'disease_acompany':
-            sql1 = ["MATCH (m:Disease)-[r:acompany_with]->(n:Disease) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql2 = ["MATCH (m:Disease)-[r:acompany_with]->(n:Disease) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql = sql1 + sql2
+            sql = """
+                CALL {
+                    UNWIND $names AS name
+                    MATCH (m:Disease)-[r:acompany_with]->(n:Disease) WHERE m.name = name
+                    RETURN m, r, n
+                    UNION ALL
+                    UNWIND $names AS name
+                    MATCH (m:Disease)-[r:acompany_with]->(n:Disease) WHERE n.name = name
+                    RETURN m, r, n
+                }
+                RETURN m.name, r.name, n.name
+            """
+
         # 查询疾病的忌口
         elif question_type == 'disease_not_food':
-            sql = ["MATCH (m:Disease)-[r:no_eat]->(n:Food) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:no_eat]->(n:Food) where m.name = name return m.name, r.name, n.name"
 
         # 查询疾病建议吃的东西
         elif question_type == 'disease_do_food':
-            sql1 = ["MATCH (m:Disease)-[r:do_eat]->(n:Food) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql2 = ["MATCH (m:Disease)-[r:recommand_eat]->(n:Food) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql = sql1 + sql2
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:do_eat|recommand_eat]->(n:Food) where m.name = name return m.name, r.name, n.name"
 
         # 已知忌口查疾病
         elif question_type == 'food_not_disease':
-            sql = ["MATCH (m:Disease)-[r:no_eat]->(n:Food) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:no_eat]->(n:Food) where n.name = name return m.name, r.name, n.name"
 
         # 已知推荐查疾病
         elif question_type == 'food_do_disease':
-            sql1 = ["MATCH (m:Disease)-[r:do_eat]->(n:Food) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql2 = ["MATCH (m:Disease)-[r:recommand_eat]->(n:Food) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql = sql1 + sql2
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:do_eat|recommand_eat]->(n:Food) where n.name = name return m.name, r.name, n.name"
 
         # 查询疾病常用药品－药品别名记得扩充
         elif question_type == 'disease_drug':
-            sql1 = ["MATCH (m:Disease)-[r:common_drug]->(n:Drug) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql2 = ["MATCH (m:Disease)-[r:recommand_drug]->(n:Drug) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql = sql1 + sql2
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:common_drug|recommand_drug]->(n:Drug) where m.name = name return m.name, r.name, n.name"
 
         # 症状对应的疾病的用药（症状+吃什么药）
         elif question_type == 'symptom_drug':
-            # 先找到症状对应的疾病，然后返回这些疾病的用药
-            sql = ["""
-                MATCH (s:Symptom)<-[:has_symptom]-(d:Disease)-[:common_drug]->(drug:Drug)
-                WHERE s.name = '{0}'
-                WITH d, drug, s, count(DISTINCT s) as symptom_count
-                ORDER BY symptom_count DESC
-                LIMIT 5
-                RETURN d.name as `d.name`, drug.name as `n.name`, s.name as `s.name`
-            """.format(i).strip() for i in entities]
+            # 先找到症状对应的疾病，然后返回这些疾病的用药，每个症状各取前5条
+            sql = """
+                UNWIND $names AS name
+                CALL {
+                    WITH name
+                    MATCH (s:Symptom)<-[:has_symptom]-(d:Disease)-[:common_drug]->(drug:Drug)
+                    WHERE s.name = name
+                    WITH d, drug, s, count(DISTINCT s) as symptom_count
+                    ORDER BY symptom_count DESC
+                    LIMIT 5
+                    RETURN d.name as `d.name`, drug.name as `n.name`, s.name as `s.name`
+                }
+                RETURN `d.name`, `n.name`, `s.name`
+            """
 
         # 已知药品查询能够治疗的疾病
         elif question_type == 'drug_disease':
-            sql1 = ["MATCH (m:Disease)-[r:common_drug]->(n:Drug) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql2 = ["MATCH (m:Disease)-[r:recommand_drug]->(n:Drug) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
-            sql = sql1 + sql2
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:common_drug|recommand_drug]->(n:Drug) where n.name = name return m.name, r.name, n.name"
+
         # 查询疾病应该进行的检查
         elif question_type == 'disease_check':
-            sql = ["MATCH (m:Disease)-[r:need_check]->(n:Check) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:need_check]->(n:Check) where m.name = name return m.name, r.name, n.name"
 
         # 已知检查查询疾病
         elif question_type == 'check_disease':
-            sql = ["MATCH (m:Disease)-[r:need_check]->(n:Check) where n.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:need_check]->(n:Check) where n.name = name return m.name, r.name, n.name"
 
         # 查询疾病所属科室
         elif question_type == 'disease_department':
-            sql = ["MATCH (m:Disease)-[r:belongs_to]->(n:Department) where m.name = '{0}' return m.name, r.name, n.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (m:Disease)-[r:belongs_to]->(n:Department) where m.name = name return m.name, r.name, n.name"
 
         # 查询药品的生产厂家
         elif question_type == 'drug_producer':
-            sql = ["MATCH (n:Drug)-[:produced_by]->(m:Producer) WHERE n.name = '{0}' RETURN n.name, m.name".format(i) for i in entities]
+            sql = "UNWIND $names AS name MATCH (n:Drug)-[:produced_by]->(m:Producer) WHERE n.name = name RETURN n.name, m.name"
 
         # 查询药品的描述信息
         elif question_type == 'drug_desc':
-            sql = ["MATCH (n:Drug) WHERE n.name = '{0}' RETURN n.name, n.desc".format(i) for i in entities]
-
-        return sql
+            sql = "UNWIND $names AS name MATCH (n:Drug) WHERE n.name = name RETURN n.name, n.desc"
 
+        if not sql:
+            return []
+        return [(sql, params)]
 
 
 if __name__ == '__main__':
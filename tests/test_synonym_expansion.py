@@ -0,0 +1,65 @@
+"""
+同义词替换：QuestionClassifier.expand_synonyms 应与逐位置的最左最长匹配一致
+"""
+
+import os
+import random
+
+import pytest
+
+from nlp.question_classifier import QuestionClassifier
+
+DICT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dict')
+
+
+def make_classifier(synonym_map):
+    classifier = QuestionClassifier.__new__(QuestionClassifier)
+    classifier.synonym_map = dict(synonym_map)
+    classifier.synonym_tree = classifier.build_synonym_tree()
+    return classifier
+
+
+def baseline_expand(synonym_map, text):
+    """基准实现：从左到右，每个位置尝试所有键，取最长的一个"""
+    keys = sorted(synonym_map, key=len, reverse=True)
+    parts = []
+    i = 0
+    while i < len(text):
+        for key in keys:
+            if text.startswith(key, i):
+                parts.append(synonym_map[key])
+                i += len(key)
+                break
+        else:
+            parts.append(text[i])
+            i += 1
+    return ''.join(parts)
+
+
+def test_shorter_match_kept_when_longer_candidate_fails():
+    synonym_map = {'b': 'B', 'cbbc': 'X', 'bbb': 'Y'}
+    classifier = make_classifier(synonym_map)
+    assert classifier.expand_synonyms('aacbb') == 'aacBB'
+    assert classifier.expand_synonyms('aacbb') == baseline_expand(synonym_map, 'aacbb')
+
+
+def test_overlapping_keys_match_baseline():
+    rng = random.Random(0)
+    for _ in range(3000):
+        keys = {''.join(rng.choice('abc') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))}
+        synonym_map = {key: key.upper() for key in keys}
+        text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 12)))
+        assert make_classifier(synonym_map).expand_synonyms(text) == baseline_expand(synonym_map, text), \
+            (synonym_map, text)
+
+
+def test_shipped_synonyms_match_baseline():
+    classifier = QuestionClassifier.__new__(QuestionClassifier)
+    classifier.synonym_path = os.path.join(DICT_DIR, 'synonym.txt')
+    if not os.path.exists(classifier.synonym_path):
+        pytest.skip('dict/synonym.txt 不存在')
+    synonym_map = classifier._load_synonym_map()
+    classifier = make_classifier(synonym_map)
+    for key in synonym_map:
+        text = '最近' + key + '，还' + key + '怎么办'
+        assert classifier.expand_synonyms(text) == baseline_expand(synonym_map, text)
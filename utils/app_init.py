@@ -14,15 +14,26 @@ from core.diagnoser import SymptomDiagnoser
 from core.analyzer import KnowledgeGraphAnalyzer
 from core.visualizer import KnowledgeGraphVisualizer
 from advanced.knowledge_reasoner import KnowledgeReasoner
+from graphdb.schema import check_store_schema
 
 logger = get_logger(__name__)
 
+# 图谱 schema 每个进程只检查一次
+_schema_checked = False
+
+# 保存进程级分类器（get_classifier）的模块不清除：重新导入会丢掉已构建的实例，
+# 之后每次 Streamlit 重跑都重新构建自动机，并与会话中机器人持有的旧实例同时存在
+_KEEP_MODULES = {'nlp', 'nlp.question_classifier', 'nlp.classifier_artifact'}
+
+
 def _clear_nlp_cache():
     """
-    清除NLP相关模块的缓存
+    清除NLP相关模块的缓存（问题分类器除外）
     """
     modules_to_remove = []
     for module_name in sys.modules.keys():
+        if module_name in _KEEP_MODULES:
+            continue
         if 'nlp' in module_name or 'question_classifier' in module_name:
             modules_to_remove.append(module_name)
     
@@ -67,8 +78,13 @@ def initialize_components():
     初始化所有核心组件
     包括：聊天机器人、症状诊断、图谱可视化、数据分析等
     """
+    global _schema_checked
     if 'bot' not in st.session_state:
         st.session_state.bot = MedicalChatBot()
+        if not _schema_checked:
+            # 缺少约束/索引时在日志中告警，并给出预计的延迟影响
+            check_store_schema(st.session_state.bot.searcher.store)
+            _schema_checked = True
         st.session_state.diagnoser = SymptomDiagnoser()
         st.session_state.visualizer = KnowledgeGraphVisualizer()
         st.session_state.analyzer = KnowledgeGraphAnalyzer()
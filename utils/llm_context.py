@@ -64,8 +64,8 @@ def build_llm_entity_context() -> Dict:
         # 尝试使用 question_classifier 提取最近用户提问中的实体
         classifier = None
         try:
-            from nlp.question_classifier import QuestionClassifier
-            classifier = QuestionClassifier()
+            from nlp.question_classifier import get_classifier
+            classifier = get_classifier()
         except Exception:
             classifier = None
 
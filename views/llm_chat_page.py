@@ -20,16 +20,16 @@ def render_llm_chat_page():
         import os
         api_key = os.getenv("DEEPSEEK_API_KEY", "")
         
-        # 使用连接的neo4j数据库
-        graph = None
+        # 使用问答机器人已经在用的图存储
+        store = None
         try:
             if 'bot' in st.session_state and hasattr(st.session_state.bot, 'searcher'):
-                if hasattr(st.session_state.bot.searcher, 'g'):
-                    graph = st.session_state.bot.searcher.g
+                if hasattr(st.session_state.bot.searcher, 'store'):
+                    store = st.session_state.bot.searcher.store
         except:
             pass
         
-        st.session_state.llm_bot = LLMChatBot(api_key=api_key, graph=graph)
+        st.session_state.llm_bot = LLMChatBot(api_key=api_key, store=store)
         
         # 初始化LLM对话历史
         if 'llm_chat_history' not in st.session_state: